@@ -1,79 +1,197 @@
 # backend/api_router.py
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from datetime import date, datetime, timezone
+from typing import Literal
 # The '.' is a relative import, meaning "from the same directory, import the services module"
 from . import services
+from .fast_json import FastJSONResponse, serialized
+from .recommendation_store import recommendation_store
+from .dashboard import get_dashboard
+from .live_updates import event_stream
+from .upstream_cache import next_period_start
 
 # APIRouter is a "mini" FastAPI app. The prefix makes all paths in this file
 # start with /api/v1, so we don't have to repeat it.
 router = APIRouter(prefix="/api/v1")
 
 @router.get("/regions")
-def get_available_regions():
+async def get_available_regions():
     """Endpoint to get the list of available regions."""
     return {"regions": services.CANONICAL_REGION_SHORTNAMES}
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Endpoint exposing upstream cache hit/miss/latency counters and the circuit breaker state."""
+    return {**services.upstream_cache.stats(), "circuit": services.upstream_breaker.state}
+
+@router.get("/dashboard/{region}")
+async def get_dashboard_endpoint(region: str, request: Request):
+    """
+    Endpoint returning every dashboard panel (current intensity, forecast, generation
+    mix, recommendations) for 'National' or a region in one round-trip, with an ETag.
+    """
+    dashboard = await get_dashboard(region)
+    headers = {"ETag": dashboard.etag, "Cache-Control": f"max-age={_seconds_until_next_period()}"}
+    if request.headers.get("if-none-match") == dashboard.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=dashboard.body, media_type="application/json", headers=headers)
+
+@router.get("/stream/{region}")
+async def stream_updates_endpoint(region: str, request: Request):
+    """
+    Server-Sent Events stream of per-period delta updates for 'National' or a region:
+    new current intensity, changed forecast points and refreshed recommendations.
+    """
+    canonical = {r.lower(): r for r in ["National", *services.CANONICAL_REGION_SHORTNAMES]}
+    if region.lower() not in canonical:
+        raise HTTPException(status_code=404, detail=f"Unknown region '{region}'.")
+    return StreamingResponse(
+        event_stream(canonical[region.lower()], request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/generation/current")
-def get_current_generation_mix():
+async def get_current_generation_mix():
     """Endpoint for the current national generation mix."""
-    return services.get_national_current_generation()
+    return await services.get_national_current_generation()
 
 @router.get("/intensity/current")
-def get_current_intensity():
+async def get_current_intensity():
     """Endpoint for the current national intensity."""
-    return services.get_national_current_intensity()
+    return await services.get_national_current_intensity()
+
+# Forecast bodies are serialized once per period; "columnar" trades the per-period
+# objects for parallel arrays (times, intensity, one array per fuel).
+ForecastFormat = Literal["full", "columnar"]
+FORMAT_QUERY = Query(default="full", alias="format", description="'full' (list of periods) or 'columnar' (parallel arrays).")
+
+def _json(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
 
 @router.get("/intensity/forecast/48h")
-def get_48h_forecast():
+async def get_48h_forecast(response_format: ForecastFormat = FORMAT_QUERY):
     """Endpoint for the 48-hour national forecast."""
-    return services.get_national_forecast_48h()
+    if response_format == "columnar":
+        return _json(await serialized("national|columnar", services.get_national_forecast_columnar))
+    return _json(await serialized("national|full", services.get_national_forecast_48h))
 
 @router.get("/intensity/regional/current/{region_shortname}")
-def get_current_regional_intensity_by_name(region_shortname: str):
+async def get_current_regional_intensity_by_name(region_shortname: str):
     """Endpoint for a region's current intensity and generation mix."""
-    regional_forecast = services.get_regional_forecast_48h(region_shortname)
-    intensity_periods = regional_forecast.get('data', [])
-    if not intensity_periods:
-        raise HTTPException(status_code=404, detail=f"No current data found for region '{region_shortname}'.")
-    
-    # Return the very first period as the "current" data
-    first_period = intensity_periods[0]
-    return {
-        "region_name": regional_forecast.get('region_name'),
-        "from": first_period.get('from'),
-        "to": first_period.get('to'),
-        "intensity": first_period.get('intensity'),
-        "generationmix": first_period.get('generationmix'),
-    }
+    return await services.get_regional_current_intensity(region_shortname)
 
 @router.get("/intensity/regional/forecast/48h/{region_shortname}")
-def get_regional_48h_forecast_endpoint_by_name(region_shortname: str):
+async def get_regional_48h_forecast_endpoint_by_name(region_shortname: str, response_format: ForecastFormat = FORMAT_QUERY):
     """Endpoint for a region's 48-hour forecast."""
-    return services.get_regional_forecast_48h(region_shortname)
+    # One cached body per known region, whatever casing the client used.
+    region = await services.canonical_region_name(region_shortname)
+    key = f"{region}|{response_format}"
+    if response_format == "columnar":
+        return _json(await serialized(key, lambda: services.get_regional_forecast_columnar(region)))
+    return _json(await serialized(key, lambda: services.get_regional_forecast_48h(region)))
 
 # --- NEW ENDPOINT FOR SMART RECOMMENDATIONS ---
 @router.get("/optimizer/appliance-recommendations")
-def get_appliance_recommendations_endpoint(
+async def get_appliance_recommendations_endpoint(
+    request: Request,
     region_shortname: str | None = Query(default=None, description="Canonical region shortname, e.g., 'London'. If omitted, provides national recommendations.")
 ):
     """
     Endpoint for the 'Smart Recommender'. Analyzes the 48-hour forecast
     and returns personalized appliance usage recommendations based on the
     character of low-carbon windows.
+
+    Results are precomputed once per settlement period (computed on demand if
+    the store is cold) and carry an ETag, so repeat polls can be answered with 304.
     """
-    return services.get_appliance_recommendations(region_shortname=region_shortname)
+    stored = await recommendation_store.get_or_compute(region_shortname)
+    headers = {"ETag": stored.etag, "Cache-Control": f"max-age={_seconds_until_next_period()}"}
+    if request.headers.get("if-none-match") == stored.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=stored.body, media_type="application/json", headers=headers)
+
+def _seconds_until_next_period() -> int:
+    now = datetime.now(timezone.utc)
+    return max(int((next_period_start(now) - now).total_seconds()), 0)
 
 
-# --- OLD OPTIMIZER ENDPOINT (KEPT FOR REFERENCE) ---
+# --- BEST-TIME OPTIMIZER ENDPOINTS ---
 @router.get("/optimizer/best-time")
-def find_best_time_endpoint(
+async def find_best_time_endpoint(
     duration_minutes: int = Query(..., gt=0),
     power_kw: float = Query(..., gt=0),
     region_shortname: str | None = None 
 ):
-    """Endpoint for the time optimization logic."""
-    return services.find_best_time_logic(
+    """Endpoint for the lowest-emission start time of a single job over the 48h forecast."""
+    return FastJSONResponse(await services.find_best_time_logic(
         duration_minutes=duration_minutes,
         power_kw=power_kw,
         region_shortname=region_shortname
-    )
\ No newline at end of file
+    ))
+
+class BestTimeJob(BaseModel):
+    duration_minutes: int = Field(..., gt=0)
+    power_kw: float = Field(..., gt=0)
+    region_shortname: str | None = None
+    job_id: str | None = None
+
+class BestTimeBatchRequest(BaseModel):
+    jobs: list[BestTimeJob] = Field(..., min_length=1, max_length=1000)
+    power_cap_kw: float | None = Field(default=None, gt=0, description="Optional shared power budget per region; jobs are placed so the combined load never exceeds it.")
+
+@router.post("/optimizer/best-time/batch")
+async def find_best_time_batch_endpoint(batch: BestTimeBatchRequest):
+    """Endpoint for scheduling many jobs (e.g. a fleet of EV chargers) against one cached forecast."""
+    return FastJSONResponse(await services.find_best_time_batch(
+        jobs=[job.model_dump() for job in batch.jobs],
+        power_cap_kw=batch.power_cap_kw
+    ))
+
+
+# --- HISTORICAL ANALYTICS ENDPOINTS (precomputed daily rollups) ---
+# Dates are inclusive UTC days; omitted bounds mean "from the first" / "through the last" collected day.
+HISTORY_FIELD = Query(default=None, description="'actual' or 'forecast'; defaults to 'actual' where collected.")
+# Multi-year ranges are thousands of rows; returning the response directly skips FastAPI's
+# jsonable_encoder pass, so orjson serializes the service result as is.
+
+@router.get("/history/series")
+async def get_history_series_endpoint():
+    """Endpoint listing the series and fields with history, and the days covered."""
+    return FastJSONResponse(await services.get_history_series())
+
+@router.get("/history/forecast-vs-actual")
+async def get_forecast_vs_actual_endpoint(start: date | None = None, end: date | None = None):
+    """Endpoint comparing the national forecast with the outturn: daily means, bias, MAE and RMSE."""
+    return FastJSONResponse(await services.get_forecast_vs_actual(start, end))
+
+@router.get("/history/{series}/daily")
+async def get_history_daily_endpoint(series: str, start: date | None = None, end: date | None = None, field: str | None = HISTORY_FIELD):
+    """Endpoint for daily mean/min/max intensity of 'National' or a region."""
+    return FastJSONResponse(await services.get_history_daily(series, field, start, end))
+
+@router.get("/history/{series}/weekly")
+async def get_history_weekly_endpoint(series: str, start: date | None = None, end: date | None = None, field: str | None = HISTORY_FIELD):
+    """Endpoint for weekly (Monday-start) mean/min/max intensity."""
+    return FastJSONResponse(await services.get_history_weekly(series, field, start, end))
+
+@router.get("/history/{series}/profile")
+async def get_history_profile_endpoint(
+    series: str, start: date | None = None, end: date | None = None, field: str | None = HISTORY_FIELD,
+    by: Literal["hour-of-day", "hour-of-week"] = "hour-of-day",
+):
+    """Endpoint for the average intensity by UTC hour of day, or by weekday and hour."""
+    return FastJSONResponse(await services.get_history_profile(series, field, start, end, by))
+
+@router.get("/history/{series}/percentiles")
+async def get_history_percentiles_endpoint(
+    series: str, start: date | None = None, end: date | None = None, field: str | None = HISTORY_FIELD,
+    q: list[float] = Query(default=[5, 25, 50, 75, 95], description="Percentiles to return (0-100); repeat the parameter for several."),
+):
+    """Endpoint for intensity percentiles over a date range."""
+    if any(not 0 <= value <= 100 for value in q):
+        raise HTTPException(status_code=422, detail="Percentiles must be between 0 and 100.")
+    return FastJSONResponse(await services.get_history_percentiles(series, field, start, end, q))
@@ -0,0 +1,81 @@
+# backend/benchmarks/fake_upstream.py
+#
+# Local stand-in for api.carbonintensity.org.uk with configurable latency and
+# error rate, so the API can be load-tested without touching the real service.
+#
+#   FAKE_UPSTREAM_LATENCY_MS=80 FAKE_UPSTREAM_ERROR_RATE=0.01 \
+#       uvicorn backend.benchmarks.fake_upstream:app --port 9001
+#   CARBON_INTENSITY_API_URL=http://localhost:9001 uvicorn backend.main:app --port 8001
+
+import asyncio
+import os
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, HTTPException
+
+from .payloads import generation_payload, national_payload, parse_iso, regional_payload
+
+LATENCY_MS = float(os.environ.get("FAKE_UPSTREAM_LATENCY_MS", "50"))
+JITTER_MS = float(os.environ.get("FAKE_UPSTREAM_JITTER_MS", "20"))
+ERROR_RATE = float(os.environ.get("FAKE_UPSTREAM_ERROR_RATE", "0"))
+
+app = FastAPI(title="Fake Carbon Intensity API")
+calls: Counter = Counter()
+
+
+async def _simulate(route: str) -> None:
+    calls[route] += 1
+    await asyncio.sleep(max(LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS), 0) / 1000)
+    if random.random() < ERROR_RATE:
+        raise HTTPException(status_code=503, detail="Simulated upstream failure.")
+
+
+def _period_start(now: datetime | None = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return now.replace(minute=now.minute - now.minute % 30, second=0, microsecond=0)
+
+
+@app.get("/intensity")
+async def current_intensity():
+    await _simulate("/intensity")
+    start = _period_start()
+    return national_payload(start, start + timedelta(minutes=30))
+
+
+@app.get("/intensity/{from_iso}/fw48h")
+async def national_forecast(from_iso: str):
+    await _simulate("/intensity/{from}/fw48h")
+    start = _period_start(parse_iso(from_iso))
+    return national_payload(start, start + timedelta(hours=48))
+
+
+@app.get("/intensity/{from_iso}/{to_iso}")
+async def national_range(from_iso: str, to_iso: str):
+    await _simulate("/intensity/{from}/{to}")
+    return national_payload(parse_iso(from_iso), parse_iso(to_iso), with_actual=True)
+
+
+@app.get("/generation")
+async def current_generation():
+    await _simulate("/generation")
+    return generation_payload(_period_start())
+
+
+@app.get("/regional/intensity/{from_iso}/{to_iso}")
+async def regional_range(from_iso: str, to_iso: str):
+    await _simulate("/regional/intensity/{from}/{to}")
+    return regional_payload(parse_iso(from_iso), parse_iso(to_iso))
+
+
+@app.get("/__stats")
+async def stats():
+    """Upstream call counts per route, read by load_test.py."""
+    return {"calls": dict(calls), "total": sum(calls.values())}
+
+
+@app.post("/__reset")
+async def reset():
+    calls.clear()
+    return {"ok": True}
@@ -0,0 +1,115 @@
+# backend/benchmarks/load_test.py
+#
+# Drives every api_router endpoint at a fixed concurrency and reports latency
+# percentiles, throughput and how many upstream calls the run cost.
+#
+#   python -m backend.benchmarks.load_test --concurrency 64 --requests 500
+#
+# Expects the API on --api-url, started with CARBON_INTENSITY_API_URL pointing
+# at the fake upstream on --upstream-url (see fake_upstream.py). The SSE stream
+# endpoint is long-lived and is not part of the request/response mix.
+
+import argparse
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+ENDPOINTS = [
+    ("regions", "GET", "/api/v1/regions", None),
+    ("cache stats", "GET", "/api/v1/cache/stats", None),
+    ("dashboard national", "GET", "/api/v1/dashboard/National", None),
+    ("dashboard regional", "GET", "/api/v1/dashboard/London", None),
+    ("generation current", "GET", "/api/v1/generation/current", None),
+    ("intensity current", "GET", "/api/v1/intensity/current", None),
+    ("forecast 48h", "GET", "/api/v1/intensity/forecast/48h", None),
+    ("regional current", "GET", "/api/v1/intensity/regional/current/London", None),
+    ("regional forecast", "GET", "/api/v1/intensity/regional/forecast/48h/Yorkshire", None),
+    ("recommendations", "GET", "/api/v1/optimizer/appliance-recommendations", None),
+    ("recommendations regional", "GET", "/api/v1/optimizer/appliance-recommendations?region_shortname=London", None),
+    ("best time", "GET", "/api/v1/optimizer/best-time?duration_minutes=120&power_kw=7", None),
+    ("best time batch", "POST", "/api/v1/optimizer/best-time/batch",
+     {"jobs": [{"duration_minutes": 30 * (1 + i % 8), "power_kw": 7.0, "region_shortname": "London"} for i in range(50)],
+      "power_cap_kw": 50.0}),
+    # Served from local rollups, not upstream; they count as errors (503) until the data collector has built them.
+    ("history series", "GET", "/api/v1/history/series", None),
+    ("history daily", "GET", "/api/v1/history/National/daily", None),
+    ("history weekly", "GET", "/api/v1/history/London/weekly?field=forecast", None),
+    ("history profile", "GET", "/api/v1/history/National/profile?by=hour-of-week", None),
+    ("history percentiles", "GET", "/api/v1/history/National/percentiles?q=10&q=50&q=90", None),
+    ("forecast vs actual", "GET", "/api/v1/history/forecast-vs-actual", None),
+]
+
+
+@dataclass
+class Result:
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+async def run_endpoint(client: httpx.AsyncClient, method: str, path: str, body, n_requests: int, concurrency: int) -> tuple[Result, float]:
+    result = Result()
+    remaining = iter(range(n_requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                if response.status_code >= 400:
+                    result.errors += 1
+            except httpx.HTTPError:
+                result.errors += 1
+            result.latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return result, time.perf_counter() - started
+
+
+async def upstream_calls(upstream_url: str) -> int | None:
+    try:
+        async with httpx.AsyncClient(base_url=upstream_url, timeout=5) as client:
+            return (await client.get("/__stats")).json()["total"]
+    except (httpx.HTTPError, ValueError, KeyError):
+        return None
+
+
+async def main(args) -> None:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.api_url, limits=limits, timeout=30) as client:
+        # Warm-up so the first period's cold fetches don't dominate the numbers.
+        for _, method, path, body in ENDPOINTS:
+            await client.request(method, path, json=body)
+
+        print(f"{'endpoint':<26} {'req':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'upstream':>9}")
+        total_upstream = 0
+        for name, method, path, body in ENDPOINTS:
+            before = await upstream_calls(args.upstream_url)
+            result, elapsed = await run_endpoint(client, method, path, body, args.requests, args.concurrency)
+            after = await upstream_calls(args.upstream_url)
+            upstream = after - before if before is not None and after is not None else None
+            total_upstream += upstream or 0
+            ms = [v * 1000 for v in result.latencies]
+            print(f"{name:<26} {len(ms):>6} {result.errors:>5} {len(ms) / elapsed:>9.1f} "
+                  f"{statistics.median(ms):>9.2f} {percentile(ms, 95):>9.2f} {percentile(ms, 99):>9.2f} "
+                  f"{'n/a' if upstream is None else upstream:>9}")
+        print(f"\nUpstream calls during measured run: {total_upstream}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-tests every API endpoint against a fake upstream.")
+    parser.add_argument("--api-url", default="http://localhost:8001")
+    parser.add_argument("--upstream-url", default="http://localhost:9001")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint.")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,182 @@
+# backend/benchmarks/microbench.py
+#
+# Microbenchmarks for the hot service paths, compared against stored baselines.
+#
+#   python -m backend.benchmarks.microbench                      # fail on regression or a missing baseline
+#   python -m backend.benchmarks.microbench --update-baselines   # record this machine's numbers
+#
+# Every benchmark is recorded relative to a fixed calibration workload timed in the
+# same run, so the numbers in baselines.json travel better between machines than
+# wall-clock times. They still depend on CPU, Python and numpy versions: regenerate
+# them locally (--update-baselines on a clean checkout) before relying on the gate.
+
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+from .. import services
+from ..fast_json import dumps
+from ..regional_store import RegionalForecastStore
+from ..upstream_cache import current_period_start
+from .payloads import national_payload, regional_payload
+
+BASELINES_PATH = Path(__file__).resolve().parent / "baselines.json"
+DEFAULT_TOLERANCE = 0.5
+BASELINES_KEY = "relative_to_calibration"
+
+
+@dataclass(frozen=True)
+class Timing:
+    seconds: float      # best per-call time
+    calibration: float  # best calibration-workload time measured in the same rounds
+
+    @property
+    def ratio(self) -> float:
+        return self.seconds / self.calibration
+
+
+def _calibration_workload() -> float:
+    # Roughly the mix the service paths do: build and walk small dicts, then a numpy pass.
+    rows = [{"from": i, "value": i * 7 % 300} for i in range(2000)]
+    total = sum(r["value"] for r in rows)
+    x = np.arange(20000, dtype=np.float64)[::-1]
+    return total + float(np.sort(x).sum())
+
+
+def _per_call(fn, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - started) / number
+
+
+def best_of(fn, repeat: int = 7, number: int = 50) -> Timing:
+    """
+    Best per-call time over `repeat` rounds of `number` calls (least affected by noise).
+    Each round also times the calibration workload right next to `fn`, so frequency
+    scaling or a busy neighbour affects both sides of the ratio alike. The garbage
+    collector is paused while timing, as timeit does.
+    """
+    timings, calibrations = [], []
+    fn()  # warm-up: first-call imports and allocations aren't part of the steady state
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            calibrations.append(_per_call(_calibration_workload, 5))
+            timings.append(_per_call(fn, number))
+    finally:
+        gc.enable()
+    return Timing(min(timings), min(calibrations))
+
+
+def run_async(coro_fn):
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(coro_fn())
+
+
+async def _fake_upstream(url: str):
+    """Zero-latency stand-in for the HTTP fetch, so the service code is all that is timed."""
+    start = current_period_start()
+    if "/regional/" in url:
+        return regional_payload(start, start + timedelta(hours=48))
+    return national_payload(start, start + timedelta(hours=48))
+
+
+def collect() -> dict[str, Timing]:
+    start = current_period_start()
+    regional = regional_payload(start, start + timedelta(hours=48))
+    national = national_payload(start, start + timedelta(hours=48))["data"]
+    services._fetch_from_api_uncached = _fake_upstream
+
+    def all_region_slices():
+        store = RegionalForecastStore.from_payload(regional)
+        return [store.forecast_periods(r) for r in services.CANONICAL_REGION_SHORTNAMES]
+
+    results = {
+        # Once per period: parse the all-regions payload into the columnar store.
+        "regional_store_parse": best_of(lambda: RegionalForecastStore.from_payload(regional), number=20),
+        # Once per period: parse plus build every canonical region's forecast slice.
+        "regional_forecast_all_regions": best_of(all_region_slices, number=20),
+        # Per request, warm cache: what get_regional_forecast_48h costs a client.
+        "regional_forecast_lookup": best_of(run_async(lambda: services.get_regional_forecast_48h("London")), number=500),
+    }
+
+    # Once per period per region and format: body serialization (afterwards served as cached bytes).
+    full = run_async(lambda: services.get_regional_forecast_48h("London"))()
+    columnar = run_async(lambda: services.get_regional_forecast_columnar("London"))()
+    results["regional_forecast_serialize_full"] = best_of(lambda: dumps(full), number=200)
+    results["regional_forecast_serialize_columnar"] = best_of(lambda: dumps(columnar), number=200)
+
+    model = services.model_registry.current
+    if model is None:
+        print("ML artifacts not loaded; skipping recommendation benchmarks.")
+        return results
+
+    intensity = np.array([p["intensity"]["forecast"] for p in national], dtype=np.float64)
+    froms, tos = [p["from"] for p in national], [p["to"] for p in national]
+    results["recommendations_pipeline"] = best_of(
+        lambda: services._recommend_from_forecast(intensity, froms, tos, model), number=200)
+
+    async def cold_recommendations():
+        services.upstream_cache.clear()
+        services.regional_store_cache.clear()
+        return await services.get_appliance_recommendations("London")
+    results["recommendations_cold_regional"] = best_of(run_async(cold_recommendations), number=20)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Service-layer microbenchmarks with baseline regression checks.")
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown over baseline as a fraction (default 0.5 = +50%%).")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Don't fail on benchmarks that have no recorded baseline yet.")
+    args = parser.parse_args()
+
+    results = collect()
+    stored = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    baselines = stored.get(BASELINES_KEY, {})
+    ratios = {name: timing.ratio for name, timing in results.items()}
+
+    regressions, missing = [], []
+    print("ratio = benchmark time / calibration workload time, measured in the same rounds\n")
+    print(f"{'benchmark':<38} {'current':>12} {'ratio':>9} {'baseline':>9} {'change':>9}")
+    for name, ratio in ratios.items():
+        baseline = baselines.get(name)
+        line = f"{name:<38} {results[name].seconds * 1e6:>10.1f}us {ratio:>9.3f}"
+        if baseline:
+            change = ratio / baseline - 1
+            flag = "  REGRESSION" if change > args.tolerance else ""
+            print(f"{line} {baseline:>9.3f} {change:>+8.1%}{flag}")
+            if flag:
+                regressions.append(name)
+        else:
+            print(f"{line} {'(none)':>9}")
+            missing.append(name)
+
+    if args.update_baselines:
+        BASELINES_PATH.write_text(json.dumps({BASELINES_KEY: {**baselines, **ratios}}, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaselines written to {BASELINES_PATH}")
+        return 0
+    failed = False
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        failed = True
+    if missing and not args.allow_missing:
+        print(f"\nFAIL: no baseline for {', '.join(missing)}; record one with --update-baselines (or pass --allow-missing).")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
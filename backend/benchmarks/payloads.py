@@ -0,0 +1,84 @@
+# backend/benchmarks/payloads.py
+#
+# Deterministic, realistically shaped Carbon Intensity API payloads shared by
+# the fake upstream and the microbenchmarks.
+
+import math
+from datetime import datetime, timedelta, timezone
+
+# Upstream reports these 17 region entries per period (12 DNO regions + aggregates).
+REGIONS = [
+    (1, "North Scotland"), (2, "South Scotland"), (3, "North West England"), (4, "North East England"),
+    (5, "Yorkshire"), (6, "North Wales & Merseyside"), (7, "South Wales"), (8, "West Midlands"),
+    (9, "East Midlands"), (10, "East England"), (11, "South West England"), (12, "South East England"),
+    (13, "London"), (14, "Scotland"), (15, "Wales"), (16, "England"), (17, "GB"),
+]
+FUELS = ["biomass", "coal", "imports", "gas", "nuclear", "other", "hydro", "solar", "wind"]
+PERIOD = timedelta(minutes=30)
+
+
+def iso(dt: datetime) -> str:
+    return dt.strftime('%Y-%m-%dT%H:%MZ')
+
+
+def parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(timezone.utc)
+
+
+def index_label(value: int) -> str:
+    for bound, label in ((40, "very low"), (120, "low"), (200, "moderate"), (290, "high")):
+        if value < bound:
+            return label
+    return "very high"
+
+
+def intensity_at(when: datetime, offset: int = 0) -> int:
+    """Daily cycle plus a slow weekly swell, shifted per region."""
+    hours = when.timestamp() / 3600
+    value = 170 + 70 * math.sin(2 * math.pi * (hours - 6) / 24) + 30 * math.sin(2 * math.pi * hours / 168) + offset
+    return max(int(value), 15)
+
+
+def generation_mix(value: int) -> list:
+    # Dirtier periods lean on gas; greener ones on wind. Percentages sum to 100.
+    gas = min(max(value / 4, 2.0), 60.0)
+    wind = max(45.0 - gas / 1.5, 5.0)
+    fixed = {"biomass": 5.0, "coal": 0.0, "imports": 9.0, "nuclear": 14.0, "other": 0.3, "hydro": 1.5, "solar": 3.0}
+    mix = {**fixed, "gas": round(gas, 1), "wind": round(wind, 1)}
+    mix["other"] = round(mix["other"] + 100.0 - sum(mix.values()), 1)
+    return [{"fuel": fuel, "perc": mix[fuel]} for fuel in FUELS]
+
+
+def periods_between(start: datetime, end: datetime) -> list:
+    periods, t = [], start
+    while t < end:
+        periods.append(t)
+        t += PERIOD
+    return periods
+
+
+def national_payload(start: datetime, end: datetime, with_actual: bool = False) -> dict:
+    data = []
+    for t in periods_between(start, end):
+        value = intensity_at(t)
+        data.append({"from": iso(t), "to": iso(t + PERIOD),
+                     "intensity": {"forecast": value, "actual": value - 3 if with_actual else None,
+                                   "index": index_label(value)}})
+    return {"data": data}
+
+
+def regional_payload(start: datetime, end: datetime) -> dict:
+    data = []
+    for t in periods_between(start, end):
+        regions = []
+        for regionid, name in REGIONS:
+            value = intensity_at(t, offset=(regionid * 37) % 120 - 60)
+            regions.append({"regionid": regionid, "dnoregion": name, "shortname": name,
+                            "intensity": {"forecast": value, "index": index_label(value)},
+                            "generationmix": generation_mix(value)})
+        data.append({"from": iso(t), "to": iso(t + PERIOD), "regions": regions})
+    return {"data": data}
+
+
+def generation_payload(start: datetime) -> dict:
+    return {"data": {"from": iso(start), "to": iso(start + PERIOD), "generationmix": generation_mix(intensity_at(start))}}
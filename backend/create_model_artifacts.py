@@ -1,55 +1,49 @@
+import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 import pickle
 from pathlib import Path
 
+try:
+    from .window_features import FEATURE_COLUMNS
+    from .history_store import HistoryStore, build_store, NATIONAL, STORE_DIR, PERIOD_SECONDS
+    from .model_registry import publish_version
+    from .model_training import featurize_history
+except ImportError:  # run as a script: python backend/create_model_artifacts.py
+    from window_features import FEATURE_COLUMNS
+    from history_store import HistoryStore, build_store, NATIONAL, STORE_DIR, PERIOD_SECONDS
+    from model_registry import publish_version
+    from model_training import featurize_history
+
 print("--- Starting ML Artifact Regeneration Script ---")
 
 # --- 1. Define Paths ---
 BASE_DIR = Path(__file__).resolve().parent
-DATA_PATH = BASE_DIR / 'data' / 'historical_intensity_data.csv'
 MODELS_PATH = BASE_DIR / 'models'
 
 # Ensure the models directory exists
 MODELS_PATH.mkdir(exist_ok=True)
 
-print(f"Reading historical data from: {DATA_PATH}")
+print(f"Reading historical data from: {STORE_DIR}")
 print(f"Artifacts will be saved to: {MODELS_PATH}")
 
-# --- 2. Load and Prepare Data ---
+# --- 2. Load Data (only the national actuals column, memory-mapped) ---
 try:
-    df = pd.read_csv(DATA_PATH)
-    df['from'] = pd.to_datetime(df['from'])
-except FileNotFoundError:
-    print(f"FATAL: Historical data file not found at {DATA_PATH}.")
+    store = HistoryStore() if HistoryStore.exists() else build_store()
+    actual = store.column(NATIONAL, 'actual')
+except (FileNotFoundError, KeyError):
+    print(f"FATAL: No historical data found in {STORE_DIR}.")
     print("Please ensure you have run the 'backend/data_collector.py' script first.")
     exit()
 
-# --- 3. Engineer Features (same logic as the notebook) ---
-mean_intensity = df['intensity.actual'].mean()
-df['is_low'] = df['intensity.actual'] < mean_intensity
-df['window_id'] = (df['is_low'] != df['is_low'].shift()).cumsum()
-low_carbon_windows = df[df['is_low']]
-
-window_features_list = []
-for _id, group in low_carbon_windows.groupby('window_id'):
-    if group.empty or len(group) < 2:
-        continue # Skip windows that are too short
-        
-    duration = len(group) * 30  # 30 minutes per period
-    window_avg_intensity = group['intensity.actual'].mean()
-    depth = (mean_intensity - window_avg_intensity) / mean_intensity
-    stability = group['intensity.actual'].std(ddof=0)
-    
-    window_features_list.append({
-        'duration': duration,
-        'depth': depth,
-        'stability': stability
-    })
-
-features_df = pd.DataFrame(window_features_list)
-features_df.dropna(inplace=True)
+# --- 3. Engineer Features (shared with the serving path in services.py) ---
+# Missing actuals are never "low", so gaps in the history split windows. Windows shorter
+# than an hour are skipped, and a window still open at the end of the data is left for
+# the next incremental update (see model_training.py).
+history = featurize_history(actual)
+
+features_df = pd.DataFrame(history.features, columns=list(FEATURE_COLUMNS))
 
 print(f"Feature engineering complete. Found {len(features_df)} valid low-carbon windows.")
 
@@ -101,4 +95,16 @@ with open(MODELS_PATH / 'cluster_to_appliance_map.pkl', 'wb') as f:
     pickle.dump(cluster_to_appliance_map, f)
 print("-> Saved cluster_to_appliance_map.pkl")
 
+# --- 7. Publish a Versioned, sklearn-free Artifact Set (hot-reloaded by the API) ---
+version = publish_version(
+    kmeans.cluster_centers_, scaler.mean_, scaler.scale_, cluster_to_appliance_map,
+    {"mode": "full", "trained_windows": len(features_df), "threshold": history.threshold, "n_periods": store.n_periods,
+     # Starting point and weights for incremental updates (python -m backend.model_training).
+     "scaler_n": len(features_df),
+     "cluster_counts": np.bincount(kmeans.labels_, minlength=kmeans.n_clusters).tolist(),
+     "trained_through": pd.Timestamp(store.start + history.resume_index * PERIOD_SECONDS, unit='s', tz='UTC').isoformat()},
+    models_path=MODELS_PATH,
+)
+print(f"-> Published version {version} and made it current")
+
 print("--- SUCCESS: All ML artifacts have been regenerated successfully. ---")
\ No newline at end of file
@@ -0,0 +1,98 @@
+# backend/dashboard.py
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+
+from . import metrics, services
+from .fast_json import dumps
+from .model_registry import model_registry
+from .recommendation_store import NATIONAL, recommendation_store
+from .upstream_cache import UpstreamCache, current_period_start
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DashboardPayload:
+    body: bytes     # serialized once per region per period
+    etag: str
+    complete: bool  # False when recommendations were unavailable
+
+
+# Same settlement-period lifetime as the upstream data it is assembled from.
+dashboard_cache = UpstreamCache()
+
+
+def _is_national(region: str) -> bool:
+    return region.lower() in (NATIONAL.lower(), "uk")
+
+
+async def _collect(region: str) -> dict:
+    """Fetches every panel concurrently; the panels share upstream fetches through the caches."""
+    if _is_national(region):
+        # /intensity and /generation aren't period-stamped; never let a stale-while-revalidate
+        # value from the previous period into a body that is cached for this one.
+        current, forecast, generation, recommendations = await asyncio.gather(
+            services.get_national_current_intensity(fresh=True),
+            services.get_national_forecast_48h(),
+            services.get_national_current_generation(fresh=True),
+            recommendation_store.get_or_compute(None),
+            return_exceptions=True,
+        )
+        generation_mix = None if isinstance(generation, Exception) else generation.get('generationmix')
+        panels = (current, forecast, generation)
+    else:
+        current, forecast, recommendations = await asyncio.gather(
+            services.get_regional_current_intensity(region),
+            services.get_regional_forecast_48h(region),
+            recommendation_store.get_or_compute(region),
+            return_exceptions=True,
+        )
+        generation_mix = None if isinstance(current, Exception) else current.get('generationmix')
+        forecast = forecast if isinstance(forecast, Exception) else forecast['data']
+        panels = (current, forecast)
+
+    # The core panels are all-or-nothing; recommendations degrade to an empty list.
+    for panel in panels:
+        if isinstance(panel, Exception):
+            raise panel
+    payload = {
+        "region": NATIONAL if _is_national(region) else region,
+        "periodStart": current_period_start().isoformat().replace('+00:00', 'Z'),
+        "current": current,
+        "forecast": forecast,
+        "generationMix": generation_mix,
+        "recommendations": [],
+    }
+    if isinstance(recommendations, Exception):
+        logger.warning(f"Dashboard for {region} served without recommendations: {recommendations}")
+        payload["recommendationsError"] = getattr(recommendations, "detail", "Recommendations are unavailable.")
+    else:
+        payload["recommendations"] = recommendations.payload
+    return payload
+
+
+async def _build(region: str) -> DashboardPayload:
+    payload = await _collect(region)
+    with metrics.stage("serialize"):
+        body = dumps(payload)
+    return DashboardPayload(body, f'"{hashlib.sha1(body).hexdigest()}"', "recommendationsError" not in payload)
+
+
+async def get_dashboard(region: str) -> DashboardPayload:
+    """One pre-serialized payload per region per period (and model version)."""
+    if not _is_national(region) and region.lower() not in {r.lower() for r in services.CANONICAL_REGION_SHORTNAMES}:
+        raise HTTPException(status_code=404, detail=f"Unknown region '{region}'.")
+    version = model_registry.current.version if model_registry.current else ""
+    # Period-stamped like fast_json.serialized: during stale-while-revalidate the previous
+    # period's body (and its ETag and max-age) must not be served into the new period.
+    key = f"{current_period_start().isoformat()}|{region.lower()}|{version}"
+    dashboard = await dashboard_cache.get(key, lambda: _build(region))
+    if not dashboard.complete:
+        # Don't pin a degraded payload for the rest of the period.
+        dashboard_cache.invalidate(key)
+    return dashboard
@@ -1,65 +1,245 @@
-import requests
+import argparse
+import asyncio
+import os
+import time
+import httpx
 import pandas as pd
-from datetime import datetime, timedelta, timezone
+import pyarrow as pa
+import pyarrow.parquet as pq
+from datetime import datetime, date, timedelta, timezone
 from pathlib import Path
-import time
+
+try:
+    from .history_store import build_store
+    from .history_rollups import update_rollups
+    from .model_training import IncrementalTrainingError, train_incremental
+except ImportError:  # run as a script: python backend/data_collector.py
+    from history_store import build_store
+    from history_rollups import update_rollups
+    from model_training import IncrementalTrainingError, train_incremental
 
 API_BASE_URL = "https://api.carbonintensity.org.uk"
 DATA_DIR = Path(__file__).resolve().parent / 'data'
+DATASET_ROOT = DATA_DIR / 'historical'
 OUTPUT_FILE = DATA_DIR / 'historical_intensity_data.csv'
 
+# The /intensity/{from}/{to} range endpoint accepts at most 14 days per request.
+MAX_CHUNK_DAYS = 14
+PERIODS_PER_DAY = 48
+# national: /intensity ranges (forecast + actual); regional: /regional/intensity ranges, one row per region.
+DATASETS = {
+    'national': {'path': 'intensity', 'columns': ['from', 'to', 'intensity.forecast', 'intensity.actual', 'intensity.index']},
+    'regional': {'path': 'regional/intensity', 'columns': ['from', 'to', 'region', 'intensity.forecast', 'intensity.index']},
+}
+
 # Ensure data directory exists
 DATA_DIR.mkdir(exist_ok=True)
 
-def fetch_data_for_day(date_str):
-    """Fetches 24 hours of intensity data for a given date."""
-    url = f"{API_BASE_URL}/intensity/date/{date_str}"
-    print(f"Fetching data for {date_str} from {url}...")
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json().get('data', [])
-    except requests.exceptions.RequestException as e:
-        print(f"  -> Error fetching data for {date_str}: {e}")
-        return None
+
+# --- Partitioned Dataset (one Parquet file per UTC day) ---
+def partition_path(dataset: str, day: date) -> Path:
+    return DATASET_ROOT / dataset / f"month={day:%Y-%m}" / f"{day:%Y-%m-%d}.parquet"
+
+def partition_files(dataset: str) -> list[Path]:
+    return sorted((DATASET_ROOT / dataset).glob('month=*/*.parquet'))
+
+# Partitions carry this schema-metadata flag once their day is complete (see is_complete).
+COMPLETE_KEY = b'carbon.complete'
+
+def completed_days(dataset: str) -> set[date]:
+    """Days whose partition is complete; these are never fetched again. Incomplete days are re-fetched."""
+    return {date.fromisoformat(p.stem) for p in partition_files(dataset)
+            if (pq.read_schema(p).metadata or {}).get(COMPLETE_KEY) == b'1'}
+
+def is_complete(dataset: str, df: pd.DataFrame) -> bool:
+    """All 48 periods present, each with its final values (actuals nationally; every region's forecast)."""
+    if df['from'].nunique() != PERIODS_PER_DAY:
+        return False
+    required = 'intensity.actual' if dataset == 'national' else 'intensity.forecast'
+    return bool(df[required].notna().all())
+
+def normalize(dataset: str, periods: list[dict]) -> pd.DataFrame:
+    if dataset == 'regional':
+        rows = [{'from': p['from'], 'to': p['to'], 'region': r.get('shortname'),
+                 'intensity.forecast': (r.get('intensity') or {}).get('forecast'),
+                 'intensity.index': (r.get('intensity') or {}).get('index')}
+                for p in periods for r in p.get('regions', [])]
+        df = pd.DataFrame(rows).reindex(columns=DATASETS[dataset]['columns'])
+        df = df.sort_values(['from', 'region']).drop_duplicates(subset=['from', 'region'])
+    else:
+        df = pd.json_normalize(periods).reindex(columns=DATASETS[dataset]['columns'])
+        df = df.sort_values('from').drop_duplicates(subset='from')
+    for col in ('intensity.forecast', 'intensity.actual'):
+        if col in df:
+            df[col] = df[col].astype('Int16')
+    return df
+
+def write_day(dataset: str, day: date, periods: list[dict]) -> bool:
+    """
+    Atomically writes one day's partition, so an interrupted run never leaves a
+    half-written checkpoint. Returns whether the day is complete.
+    """
+    df = normalize(dataset, periods)
+    complete = is_complete(dataset, df)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), COMPLETE_KEY: b'1' if complete else b'0'})
+    path = partition_path(dataset, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.parquet.tmp')
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return complete
+
+def export_csv() -> int:
+    """Consolidates the national dataset into the legacy single-CSV format."""
+    files = partition_files('national')
+    if not files:
+        return 0
+    df = pd.concat((pd.read_parquet(f) for f in files), ignore_index=True)
+    df.to_csv(OUTPUT_FILE, index=False)
+    return len(df)
+
+
+# --- Planning: which days are missing, grouped into range requests ---
+def plan_chunks(start_day: date, end_day: date, done: set[date], chunk_days: int) -> list[list[date]]:
+    """Contiguous runs of days not yet complete between start_day and end_day, split into chunks of at most chunk_days."""
+    chunks, current = [], []
+    day = start_day
+    while day <= end_day:
+        if day in done:
+            if current:
+                chunks.append(current)
+                current = []
+        else:
+            current.append(day)
+            if len(current) == chunk_days:
+                chunks.append(current)
+                current = []
+        day += timedelta(days=1)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# --- Fetching: bounded concurrency plus a global request-rate limit ---
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart across all workers."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+async def fetch_chunk(client, limiter, semaphore, dataset: str, days: list[date], retries: int = 3):
+    """Fetches a run of days with one range request; returns None if every attempt failed."""
+    from_iso = f"{days[0]:%Y-%m-%d}T00:00Z"
+    to_iso = f"{days[-1] + timedelta(days=1):%Y-%m-%d}T00:00Z"
+    url = f"{API_BASE_URL}/{DATASETS[dataset]['path']}/{from_iso}/{to_iso}"
+    async with semaphore:
+        for attempt in range(1, retries + 1):
+            await limiter.wait()
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+                return response.json().get('data', [])
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"  -> Attempt {attempt}/{retries} failed for {days[0]}..{days[-1]}: {e}")
+                if attempt < retries:
+                    await asyncio.sleep(2 ** attempt)
+    return None
+
+def split_by_day(periods: list[dict], days: list[date]) -> dict[date, list[dict]]:
+    """Groups periods by the UTC day they start in, keeping only the requested days."""
+    wanted = set(days)
+    by_day: dict[date, list[dict]] = {d: [] for d in days}
+    for period in periods:
+        day = datetime.fromisoformat(period['from'].replace('Z', '+00:00')).date()
+        if day in wanted:
+            by_day[day].append(period)
+    return by_day
+
+async def collect(dataset: str, start_day: date, end_day: date, concurrency: int, rate: float, chunk_days: int) -> tuple[int, int]:
+    chunks = plan_chunks(start_day, end_day, completed_days(dataset), chunk_days)
+    total_days = sum(len(c) for c in chunks)
+    print(f"[{dataset}] {total_days} missing or incomplete day(s) between {start_day} and {end_day} in {len(chunks)} request(s).")
+
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    written = failed = incomplete = 0
+    async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=5.0)) as client:
+        async def fetch(days: list[date]):
+            return days, await fetch_chunk(client, limiter, semaphore, dataset, days)
+
+        # In completion order, so a slow or retrying chunk never holds back writing the ones that landed.
+        for next_done in asyncio.as_completed([fetch(days) for days in chunks]):
+            days, periods = await next_done
+            if periods is None:
+                failed += len(days)
+                continue
+            # Checkpoint as soon as each chunk lands, day by day.
+            for day, day_periods in split_by_day(periods, days).items():
+                if day_periods:
+                    incomplete += not write_day(dataset, day, day_periods)
+                    written += 1
+            print(f"  -> Saved {days[0]}..{days[-1]} ({len(periods)} periods).")
+    if incomplete:
+        print(f"  -> {incomplete} day(s) still incomplete upstream; they will be re-fetched on the next run.")
+    return written, failed
 
 def main():
+    parser = argparse.ArgumentParser(description="Collects historical carbon intensity into a partitioned Parquet dataset.")
+    parser.add_argument('--dataset', choices=[*DATASETS, 'all'], default='national', help="Which series to collect.")
+    parser.add_argument('--days', type=int, default=730, help="How far back to collect (default: ~2 years).")
+    parser.add_argument('--concurrency', type=int, default=4, help="Maximum requests in flight.")
+    parser.add_argument('--rate', type=float, default=2.0, help="Maximum requests started per second.")
+    parser.add_argument('--chunk-days', type=int, default=MAX_CHUNK_DAYS, help="Days per range request (max 14).")
+    parser.add_argument('--no-store', action='store_true', help="Skip rebuilding the memory-mapped history store.")
+    parser.add_argument('--update-model', action='store_true',
+                        help="Fold the newly collected periods into the current model version (incremental training).")
+    parser.add_argument('--export-csv', action='store_true', help="Also export the national dataset as a single CSV.")
+    args = parser.parse_args()
+
     print("--- Starting Historical Carbon Intensity Data Collector ---")
-    
-    end_date = datetime.now(timezone.utc)
-    start_date = end_date - timedelta(days=730) # Approx 2 years
-    
-    all_data = []
-    current_date = start_date
-    
-    while current_date <= end_date:
-        date_str = current_date.strftime('%Y-%m-%d')
-        daily_data = fetch_data_for_day(date_str)
-        
-        if daily_data:
-            all_data.extend(daily_data)
-            print(f"  -> Successfully fetched {len(daily_data)} periods.")
-        
-        current_date += timedelta(days=1)
-        time.sleep(0.5) # Be respectful to the API
-
-    if not all_data:
-        print("No data collected. Exiting.")
-        return
 
-    # Use json_normalize to correctly flatten the nested JSON.
-    df = pd.json_normalize(all_data)
-    
-    print(f"\nTotal periods collected: {len(df)}")
-    
-    if 'intensity.actual' not in df.columns:
-        print("\nFATAL: 'intensity.actual' column was not found after fetching.")
+    # Only whole UTC days are checkpointed; today is picked up by the next incremental run.
+    end_day = datetime.now(timezone.utc).date() - timedelta(days=1)
+    start_day = end_day - timedelta(days=args.days)
+    chunk_days = max(1, min(args.chunk_days, MAX_CHUNK_DAYS))
+
+    datasets = list(DATASETS) if args.dataset == 'all' else [args.dataset]
+    for dataset in datasets:
+        written, failed = asyncio.run(collect(dataset, start_day, end_day, args.concurrency, args.rate, chunk_days))
+        print(f"\nWrote {written} day partition(s) to {DATASET_ROOT / dataset}.")
+        if failed:
+            print(f"WARNING: {failed} day(s) could not be fetched; re-run to resume them.")
+
+    if not partition_files('national') and not partition_files('regional'):
+        print("No data collected. Exiting.")
         return
-        
-    df.to_csv(OUTPUT_FILE, index=False)
-    
-    print(f"\nSUCCESS: Historical data has been saved to {OUTPUT_FILE}")
+    if not args.no_store:
+        store = build_store()
+        print(f"History store rebuilt at {store.root}: {store.n_periods} periods x {len(store.series())} series.")
+        rollups = update_rollups(store)
+        print(f"Analytics rollups updated through {rollups.last_day} at {rollups.root}.")
+        if args.update_model:
+            try:
+                version = train_incremental(store)
+                print(f"Model updated incrementally: version {version}." if version else "Model already up to date.")
+            except IncrementalTrainingError as e:
+                print(f"WARNING: incremental model update skipped: {e}")
+    if args.export_csv:
+        rows = export_csv()
+        print(f"Total periods in dataset: {rows}")
+        print(f"\nSUCCESS: Historical data has been saved to {OUTPUT_FILE}")
     print("--- Data Collection Complete ---")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,49 @@
+# backend/fast_json.py
+
+from typing import Any, Awaitable, Callable
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from . import metrics
+from .upstream_cache import UpstreamCache, current_period_start
+
+# Numpy arrays and scalars serialize natively, so columnar payloads skip .tolist().
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any):
+    # Anything orjson doesn't know is stringified, matching the previous json.dumps(default=str).
+    if hasattr(obj, "item"):
+        return obj.item()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes via orjson."""
+    return orjson.dumps(obj, default=_default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: orjson instead of stdlib json for route return values."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Pre-serialized bodies for responses that only change when the period does.
+serialized_cache = UpstreamCache()
+
+
+async def serialized(key: str, producer: Callable[[], Awaitable[Any]]) -> bytes:
+    """
+    JSON bytes for `producer()`'s result, built once per settlement period and key.
+
+    The key is stamped with the period start, so a body is never served stale
+    into the next period even while the underlying caches revalidate.
+    """
+    async def load() -> bytes:
+        payload = await producer()
+        with metrics.stage("serialize"):
+            return dumps(payload)
+    return await serialized_cache.get(f"{current_period_start().isoformat()}|{key}", load)
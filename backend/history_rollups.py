@@ -0,0 +1,330 @@
+# backend/history_rollups.py
+#
+# Per-day pre-aggregates over the history store, so historical queries never scan
+# raw periods: a multi-year range is a sum over a few hundred rows per column.
+#
+#   data/rollups/meta.json                  grid start, days covered, histogram bins, columns
+#   data/rollups/<series>.<field>.npz       per day: count, sum, min, max, hourly sums/counts, histogram
+#   data/rollups/national.error.npz         per day: forecast - actual error sums (forecast vs actual)
+#
+# Days are UTC and aligned with the store's grid (which starts at midnight). The
+# rollups are maintained incrementally: an update only recomputes days that are
+# new or were incomplete (fewer than 48 periods) last time, e.g. after the
+# collector backfills a gap.
+#
+#   python -m backend.history_rollups
+
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .history_store import DATA_DIR, MISSING, NATIONAL, PERIOD_SECONDS, HistoryStore, series_slug
+except ImportError:  # imported by data_collector.py run as a script
+    from history_store import DATA_DIR, MISSING, NATIONAL, PERIOD_SECONDS, HistoryStore, series_slug
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIR = DATA_DIR / 'rollups'
+PERIODS_PER_DAY = 24 * 3600 // PERIOD_SECONDS
+# Histogram of per-period values for percentile queries: 5 gCO2/kWh bins up to 1000.
+BIN_WIDTH = 5
+N_BINS = 200
+ERROR = 'error'
+
+
+# --- Per-Day Aggregation ---
+def _value_rollup(days: np.ndarray) -> dict[str, np.ndarray]:
+    """Aggregates for an int16 (n_days, 48) block with MISSING where absent."""
+    present = days != MISSING
+    values = np.where(present, days, 0).astype(np.float64)
+    count = present.sum(axis=1)
+    bins = np.clip(days // BIN_WIDTH, 0, N_BINS - 1).astype(np.int64)
+    flat = (np.arange(len(days))[:, None] * N_BINS + bins)[present]
+    return {
+        'count': count.astype(np.int16),
+        'sum': values.sum(axis=1),
+        'min': np.where(count > 0, np.where(present, days, np.iinfo(np.int16).max).min(axis=1), MISSING).astype(np.int16),
+        'max': np.where(count > 0, np.where(present, days, MISSING).max(axis=1), MISSING).astype(np.int16),
+        'hour_sum': values.reshape(len(days), 24, PERIODS_PER_DAY // 24).sum(axis=2),
+        'hour_count': present.reshape(len(days), 24, PERIODS_PER_DAY // 24).sum(axis=2).astype(np.int16),
+        'hist': np.bincount(flat, minlength=len(days) * N_BINS).reshape(len(days), N_BINS).astype(np.int16),
+    }
+
+
+def _error_rollup(forecast: np.ndarray, actual: np.ndarray) -> dict[str, np.ndarray]:
+    """Forecast-minus-actual aggregates over periods where both are present."""
+    both = (forecast != MISSING) & (actual != MISSING)
+    f = np.where(both, forecast, 0).astype(np.float64)
+    a = np.where(both, actual, 0).astype(np.float64)
+    error = f - a
+    return {
+        'count': both.sum(axis=1).astype(np.int16),
+        'sum': error.sum(axis=1),
+        'abs_sum': np.abs(error).sum(axis=1),
+        'sq_sum': (error ** 2).sum(axis=1),
+        'forecast_sum': f.sum(axis=1),
+        'actual_sum': a.sum(axis=1),
+    }
+
+
+def _days(column: np.ndarray, n_days: int, rows: np.ndarray) -> np.ndarray:
+    # Fancy indexing a memmap only touches the requested day rows.
+    return np.asarray(column[:n_days * PERIODS_PER_DAY].reshape(n_days, PERIODS_PER_DAY)[rows])
+
+
+def _merge(old: dict | None, new_rows: np.ndarray, fresh: dict, n_days: int) -> dict[str, np.ndarray]:
+    merged = {}
+    for name, values in fresh.items():
+        out = np.zeros((n_days, *values.shape[1:]), dtype=values.dtype)
+        if old is not None:
+            kept = min(len(old[name]), n_days)
+            out[:kept] = old[name][:kept]
+        out[new_rows] = values
+        merged[name] = out
+    return merged
+
+
+def _stale_rows(old: dict | None, n_days: int) -> np.ndarray:
+    """Day rows to (re)compute: everything new, plus days that were incomplete."""
+    if old is None:
+        return np.arange(n_days)
+    known = min(len(old['count']), n_days)
+    incomplete = np.flatnonzero(old['count'][:known] < PERIODS_PER_DAY)
+    return np.concatenate([incomplete, np.arange(known, n_days)])
+
+
+def _save(path: Path, arrays: dict) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def update_rollups(store: HistoryStore | None = None, root: Path = ROLLUP_DIR) -> "HistoryRollups":
+    """Brings the rollups up to date with the history store, recomputing only stale days."""
+    store = store or HistoryStore()
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    n_days = store.n_periods // PERIODS_PER_DAY
+
+    meta = None
+    if (root / 'meta.json').exists():
+        with open(root / 'meta.json') as f:
+            meta = json.load(f)
+        # A store that now starts on a different day (or re-binned histograms) invalidates everything.
+        if meta['start'] != store.start or meta['bin_width'] != BIN_WIDTH or meta['n_bins'] != N_BINS:
+            meta = None
+    known = set(meta['columns']) if meta else set()
+
+    def load_old(key: str) -> dict | None:
+        if key not in known:
+            return None
+        with np.load(root / f"{key}.npz") as stored:
+            return {name: stored[name] for name in stored.files}
+
+    columns: dict[str, dict] = {}
+    recomputed = 0
+    for series, fields in store.series().items():
+        for field in fields:
+            key = f"{series_slug(series)}.{field}"
+            old = load_old(key)
+            rows = _stale_rows(old, n_days)
+            fresh = _value_rollup(_days(store.column(series, field), n_days, rows))
+            _save(root / f"{key}.npz", _merge(old, rows, fresh, n_days))
+            columns[key] = {'series': series, 'field': field}
+            recomputed += len(rows)
+
+    national_fields = store.series().get(NATIONAL, [])
+    if 'forecast' in national_fields and 'actual' in national_fields:
+        key = f"{NATIONAL}.{ERROR}"
+        old = load_old(key)
+        rows = _stale_rows(old, n_days)
+        fresh = _error_rollup(_days(store.column(NATIONAL, 'forecast'), n_days, rows),
+                              _days(store.column(NATIONAL, 'actual'), n_days, rows))
+        _save(root / f"{key}.npz", _merge(old, rows, fresh, n_days))
+        columns[key] = {'series': NATIONAL, 'field': ERROR}
+        recomputed += len(rows)
+
+    # meta.json is written last; readers reload when it changes.
+    tmp = root / 'meta.json.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'start': store.start, 'n_days': n_days, 'bin_width': BIN_WIDTH, 'n_bins': N_BINS,
+                   'columns': columns}, f, indent=2)
+    os.replace(tmp, root / 'meta.json')
+    logger.info(f"Rollups updated: {recomputed} day rows recomputed across {len(columns)} columns ({n_days} days).")
+    return HistoryRollups(root)
+
+
+# --- Queries ---
+def _mean(total, count):
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def _round(values) -> list:
+    """Rounded floats with NaN (no data) as None."""
+    return [None if np.isnan(v) else round(float(v), 2) for v in np.atleast_1d(values)]
+
+
+class HistoryRollups:
+    """Read-side API over the rollups; every query is O(days in range)."""
+
+    def __init__(self, root: Path = ROLLUP_DIR):
+        self.root = Path(root)
+        with open(self.root / 'meta.json') as f:
+            self.meta = json.load(f)
+        self.first_day = datetime.fromtimestamp(self.meta['start'], tz=timezone.utc).date()
+        self.n_days = int(self.meta['n_days'])
+        self._arrays: dict[str, dict] = {}
+
+    @staticmethod
+    def exists(root: Path = ROLLUP_DIR) -> bool:
+        return (Path(root) / 'meta.json').exists()
+
+    @property
+    def last_day(self) -> date:
+        return self.first_day + timedelta(days=self.n_days - 1)
+
+    def series(self) -> dict[str, list[str]]:
+        """Series name -> fields with value rollups, e.g. {'national': ['forecast', 'actual'], 'London': ['forecast']}."""
+        out: dict[str, list[str]] = {}
+        for column in self.meta['columns'].values():
+            if column['field'] != ERROR:
+                out.setdefault(column['series'], []).append(column['field'])
+        return out
+
+    @property
+    def has_forecast_error(self) -> bool:
+        return f"{NATIONAL}.{ERROR}" in self.meta['columns']
+
+    def resolve(self, series: str, field: str | None = None) -> tuple[str, str]:
+        """Canonical (series, field); the field defaults to 'actual' where collected, else 'forecast'."""
+        for name, fields in self.series().items():
+            if name.lower() == series.lower():
+                if field is None:
+                    field = 'actual' if 'actual' in fields else 'forecast'
+                if field in fields:
+                    return name, field
+                raise KeyError(f"No field '{field}' for series '{name}'.")
+        raise KeyError(f"Unknown series '{series}'.")
+
+    def day_range(self, start: date | None, end: date | None) -> tuple[int, int]:
+        """[d0, d1) day rows covering `start`..`end` inclusive, clipped to the data."""
+        d0 = 0 if start is None else (start - self.first_day).days
+        d1 = self.n_days if end is None else (end - self.first_day).days + 1
+        return max(d0, 0), min(max(d1, 0), self.n_days)
+
+    def _column(self, series: str, field: str) -> dict[str, np.ndarray]:
+        key = f"{series_slug(series)}.{field}"
+        if key not in self._arrays:
+            with np.load(self.root / f"{key}.npz") as stored:
+                self._arrays[key] = {name: stored[name] for name in stored.files}
+        return self._arrays[key]
+
+    def _dates(self, d0: int, d1: int) -> list[str]:
+        return [(self.first_day + timedelta(days=d)).isoformat() for d in range(d0, d1)]
+
+    def daily(self, series: str, field: str, start: date | None = None, end: date | None = None) -> list[dict]:
+        d0, d1 = self.day_range(start, end)
+        col = self._column(series, field)
+        count = col['count'][d0:d1]
+        means = _round(_mean(col['sum'][d0:d1], count))
+        return [{"date": day, "mean": mean, "min": int(lo) if n else None, "max": int(hi) if n else None, "periods": int(n)}
+                for day, mean, lo, hi, n in zip(self._dates(d0, d1), means, col['min'][d0:d1], col['max'][d0:d1], count)]
+
+    def weekly(self, series: str, field: str, start: date | None = None, end: date | None = None) -> list[dict]:
+        """ISO weeks (Monday start) overlapping the range; partial weeks cover only the days in range."""
+        d0, d1 = self.day_range(start, end)
+        if d0 >= d1:
+            return []
+        col = self._column(series, field)
+        first_weekday = (self.first_day + timedelta(days=d0)).weekday()
+        # Days are consecutive, so each week is a contiguous run of rows.
+        bounds = np.unique(np.r_[0, np.arange((7 - first_weekday) % 7, d1 - d0, 7)])
+        count = np.add.reduceat(col['count'][d0:d1].astype(np.int64), bounds)
+        total = np.add.reduceat(col['sum'][d0:d1], bounds)
+        has_data = col['count'][d0:d1] > 0
+        lo = np.minimum.reduceat(np.where(has_data, col['min'][d0:d1], np.iinfo(np.int16).max), bounds)
+        hi = np.maximum.reduceat(np.where(has_data, col['max'][d0:d1], MISSING), bounds)
+        weeks = []
+        for b, n, mean, l, h in zip(bounds.tolist(), count.tolist(), _round(_mean(total, count)), lo.tolist(), hi.tolist()):
+            day = self.first_day + timedelta(days=d0 + b)
+            weeks.append({"weekStart": (day - timedelta(days=day.weekday())).isoformat(), "mean": mean,
+                          "min": l if n else None, "max": h if n else None, "periods": n})
+        return weeks
+
+    def profile(self, series: str, field: str, start: date | None = None, end: date | None = None,
+                by: str = "hour-of-day") -> list:
+        """Mean by UTC hour of day (24 values) or by weekday x hour (7 lists of 24, Monday first)."""
+        d0, d1 = self.day_range(start, end)
+        col = self._column(series, field)
+        hour_sum, hour_count = col['hour_sum'][d0:d1], col['hour_count'][d0:d1].astype(np.int64)
+        if by == "hour-of-day":
+            return _round(_mean(hour_sum.sum(axis=0), hour_count.sum(axis=0)))
+        weekday = (self.first_day.weekday() + np.arange(d0, d1)) % 7
+        week_sum, week_count = np.zeros((7, 24)), np.zeros((7, 24), dtype=np.int64)
+        np.add.at(week_sum, weekday, hour_sum)
+        np.add.at(week_count, weekday, hour_count)
+        return [_round(row) for row in _mean(week_sum, week_count)]
+
+    def percentiles(self, series: str, field: str, qs: list[float], start: date | None = None,
+                    end: date | None = None) -> dict[str, float | None]:
+        """Percentiles from the summed daily histograms, interpolated within a bin (accurate to BIN_WIDTH)."""
+        d0, d1 = self.day_range(start, end)
+        hist = self._column(series, field)['hist'][d0:d1].sum(axis=0, dtype=np.int64)
+        total = int(hist.sum())
+        cdf = np.cumsum(hist)
+        out = {}
+        for q in qs:
+            if total == 0:
+                out[f"p{q:g}"] = None
+                continue
+            target = max(q / 100 * total, 1e-9)  # p0 lands in the first non-empty bin
+            b = min(int(np.searchsorted(cdf, target)), N_BINS - 1)
+            below = cdf[b - 1] if b > 0 else 0
+            frac = (target - below) / hist[b] if hist[b] else 0.0
+            out[f"p{q:g}"] = round(float((b + frac) * BIN_WIDTH), 1)
+        return out
+
+    def forecast_vs_actual(self, start: date | None = None, end: date | None = None) -> dict:
+        """Daily national forecast and actual means with bias, MAE and RMSE, plus the same over the range."""
+        d0, d1 = self.day_range(start, end)
+        col = self._column(NATIONAL, ERROR)
+        count = col['count'][d0:d1].astype(np.int64)
+
+        def stats(n, forecast_sum, actual_sum, err_sum, abs_sum, sq_sum):
+            return {"forecastMean": _round(_mean(forecast_sum, n)), "actualMean": _round(_mean(actual_sum, n)),
+                    "bias": _round(_mean(err_sum, n)), "mae": _round(_mean(abs_sum, n)),
+                    "rmse": _round(np.sqrt(_mean(sq_sum, n))), "periods": np.atleast_1d(n).tolist()}
+
+        names = ('forecast_sum', 'actual_sum', 'sum', 'abs_sum', 'sq_sum')
+        daily = stats(count, *(col[name][d0:d1] for name in names))
+        overall = stats(count.sum(), *(col[name][d0:d1].sum() for name in names))
+        return {
+            "days": [{"date": day, **{k: v[i] for k, v in daily.items()}} for i, day in enumerate(self._dates(d0, d1))],
+            "summary": {k: v[0] for k, v in overall.items()},
+        }
+
+
+_opened: tuple[float, HistoryRollups] | None = None
+
+
+def open_rollups(root: Path = ROLLUP_DIR) -> HistoryRollups | None:
+    """The current rollups, reopened whenever an update has rewritten meta.json; None if never built."""
+    global _opened
+    try:
+        mtime = (Path(root) / 'meta.json').stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if _opened is None or _opened[0] != mtime or _opened[1].root != Path(root):
+        _opened = (mtime, HistoryRollups(root))
+    return _opened[1]
+
+
+if __name__ == "__main__":
+    rollups = update_rollups()
+    print(f"Rollups in {rollups.root}: {rollups.first_day} to {rollups.last_day}, {len(rollups.series())} series.")
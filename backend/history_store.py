@@ -0,0 +1,183 @@
+# backend/history_store.py
+#
+# Compact, memory-mapped columnar store for historical intensity series.
+#
+#   data/store/meta.json                 grid start, period length, series -> fields
+#   data/store/timestamps.npy            int64 epoch seconds, one per half-hour period
+#   data/store/<series>.<field>.npy      int16 intensity per period, MISSING where absent
+#
+# data/store is a symlink to the current build (data/store.<build id>/); each rebuild
+# writes into data/store.<build id>.building/, renames it once complete and swaps the
+# link atomically, so readers always see a whole store and an interrupted build
+# leaves nothing the next one trips over.
+#
+# Every series shares one regular 30-minute grid, so a time range maps to an index
+# range by arithmetic and each column is a plain .npy file that np.load can map
+# without reading it. Built (or rebuilt) from the Parquet dataset written by
+# data_collector.py, one day partition at a time.
+#
+#   python -m backend.history_store
+
+import json
+import os
+import re
+import shutil
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+DATASET_DIR = DATA_DIR / 'historical'
+STORE_DIR = DATA_DIR / 'store'
+
+PERIOD_SECONDS = 30 * 60
+MISSING = -1
+NATIONAL = 'national'
+# Parquet column -> store field
+FIELDS = {'intensity.forecast': 'forecast', 'intensity.actual': 'actual'}
+# Suffix of a build still being written; older than STALE_BUILD_SECONDS it is a crashed one.
+BUILDING_SUFFIX = '.building'
+STALE_BUILD_SECONDS = 24 * 3600
+
+
+def series_slug(series: str) -> str:
+    return series.lower().replace(' ', '_')
+
+
+class HistoryStore:
+    """Read-side API over a built store; columns are memory-mapped by default."""
+
+    def __init__(self, root: Path = STORE_DIR):
+        # Pin the build the link points at now, so a rebuild can't swap columns under us.
+        self.root = Path(root).resolve()
+        with open(self.root / 'meta.json') as f:
+            self.meta = json.load(f)
+        self.start = int(self.meta['start'])
+        self.n_periods = int(self.meta['n_periods'])
+
+    @staticmethod
+    def exists(root: Path = STORE_DIR) -> bool:
+        return (Path(root) / 'meta.json').exists()
+
+    def series(self) -> dict[str, list[str]]:
+        """Series name -> available fields, e.g. {'national': ['forecast', 'actual'], 'London': ['forecast']}."""
+        return self.meta['series']
+
+    def timestamps(self, mmap: bool = True) -> np.ndarray:
+        return np.load(self.root / 'timestamps.npy', mmap_mode='r' if mmap else None)
+
+    def column(self, series: str, field: str, mmap: bool = True) -> np.ndarray:
+        """int16 column with MISSING for absent periods; a read-only memmap unless mmap=False."""
+        for name, fields in self.series().items():
+            if name.lower() == series.lower() and field in fields:
+                return np.load(self.root / f"{series_slug(name)}.{field}.npy", mmap_mode='r' if mmap else None)
+        raise KeyError(f"No field '{field}' for series '{series}' in {self.root}")
+
+    def index_range(self, start: datetime | None = None, end: datetime | None = None) -> tuple[int, int]:
+        """[i0, i1) covering periods starting in [start, end); O(1) on the regular grid."""
+        i0 = 0 if start is None else (int(start.timestamp()) - self.start + PERIOD_SECONDS - 1) // PERIOD_SECONDS
+        i1 = self.n_periods if end is None else (int(end.timestamp()) - self.start + PERIOD_SECONDS - 1) // PERIOD_SECONDS
+        return max(i0, 0), min(max(i1, 0), self.n_periods)
+
+
+# --- Building the store from the Parquet dataset ---
+def _partitions(dataset: str) -> list[Path]:
+    return sorted((DATASET_DIR / dataset).glob('month=*/*.parquet'))
+
+def build_store(store_root: Path = STORE_DIR) -> HistoryStore:
+    """
+    Rebuilds the store from the national and (if collected) regional datasets.
+
+    Columns are written through np.lib.format.open_memmap and filled one day
+    partition at a time, so peak memory is one day plus the OS page cache.
+    """
+    national, regional = _partitions('national'), _partitions('regional')
+    days = [date.fromisoformat(p.stem) for p in national + regional]
+    if not days:
+        raise FileNotFoundError(f"No Parquet partitions found under {DATASET_DIR}.")
+
+    start = int(datetime.combine(min(days), datetime.min.time(), tzinfo=timezone.utc).timestamp())
+    n_periods = ((max(days) - min(days)).days + 1) * 48
+
+    store_root = Path(store_root)
+    build_root = store_root.with_name(f"{store_root.name}.{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}")
+    work_root = build_root.with_name(build_root.name + BUILDING_SUFFIX)
+    work_root.mkdir(parents=True)
+    columns: dict[tuple[str, str], np.memmap] = {}
+
+    def column(series: str, field: str) -> np.memmap:
+        if (series, field) not in columns:
+            col = np.lib.format.open_memmap(work_root / f"{series_slug(series)}.{field}.npy",
+                                            mode='w+', dtype=np.int16, shape=(n_periods,))
+            col[:] = MISSING
+            columns[(series, field)] = col
+        return columns[(series, field)]
+
+    grid_start = pd.Timestamp(start, unit='s', tz='UTC')
+
+    def period_index(froms: pd.Series) -> np.ndarray:
+        return ((pd.to_datetime(froms, utc=True) - grid_start) // pd.Timedelta(seconds=PERIOD_SECONDS)).to_numpy()
+
+    for path in national:
+        df = pd.read_parquet(path, columns=['from', *FIELDS])
+        idx = period_index(df['from'])
+        for src, field in FIELDS.items():
+            col = column(NATIONAL, field)
+            values = df[src]
+            present = values.notna().to_numpy()
+            col[idx[present]] = values[present].to_numpy(dtype=np.int16)
+
+    for path in regional:
+        df = pd.read_parquet(path, columns=['from', 'region', 'intensity.forecast'])
+        df = df[df['intensity.forecast'].notna()]
+        idx = period_index(df['from'])
+        for region, rows in df.groupby('region').indices.items():
+            column(region, 'forecast')[idx[rows]] = df['intensity.forecast'].to_numpy(dtype=np.int16)[rows]
+
+    np.save(work_root / 'timestamps.npy', start + np.arange(n_periods, dtype=np.int64) * PERIOD_SECONDS)
+    series: dict[str, list[str]] = {}
+    for (name, field), col in columns.items():
+        col.flush()
+        series.setdefault(name, []).append(field)
+    columns.clear()  # drop the write maps before publishing
+    with open(work_root / 'meta.json', 'w') as f:
+        json.dump({'start': start, 'period_seconds': PERIOD_SECONDS, 'n_periods': n_periods,
+                   'missing': MISSING, 'series': series}, f, indent=2)
+
+    os.replace(work_root, build_root)
+    _publish(store_root, build_root)
+    return HistoryStore(store_root)
+
+
+def _publish(store_root: Path, build_root: Path) -> None:
+    """Points `store_root` at `build_root` atomically, then prunes older builds."""
+    previous = store_root.resolve() if store_root.is_symlink() else None
+    if store_root.exists() and not store_root.is_symlink():
+        # A store from before builds were versioned: move it aside once.
+        os.replace(store_root, store_root.with_name(f"{store_root.name}.legacy"))
+    link = store_root.with_name(store_root.name + '.link')
+    if link.is_symlink():
+        link.unlink()
+    os.symlink(build_root.name, link)
+    os.replace(link, store_root)
+
+    # Keep the build readers may still have open; older published builds are superseded.
+    # Builds still being written (maybe by a concurrent run) are left alone unless stale,
+    # and the moved-aside legacy store is never touched here.
+    keep = {build_root.resolve(), previous}
+    published = re.compile(rf"{re.escape(store_root.name)}\.\d{{8}}T\d{{12}}")
+    stale_before = time.time() - STALE_BUILD_SECONDS
+    for path in store_root.parent.glob(f"{store_root.name}.*"):
+        if not path.is_dir() or path.is_symlink() or path.resolve() in keep:
+            continue
+        if published.fullmatch(path.name) or (
+                path.name.endswith(BUILDING_SUFFIX) and path.stat().st_mtime < stale_before):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    store = build_store()
+    print(f"Built {store.root}: {store.n_periods} periods x {len(store.series())} series.")
@@ -0,0 +1,145 @@
+# backend/live_updates.py
+
+import asyncio
+import logging
+
+from . import metrics, services
+from .fast_json import dumps
+from .recommendation_store import NATIONAL, recommendation_store
+from .upstream_cache import current_period_start
+
+logger = logging.getLogger(__name__)
+
+# Per-subscriber backlog; a client that falls this far behind loses its oldest deltas.
+QUEUE_SIZE = 8
+KEEPALIVE_SECONDS = 15.0
+
+
+def _iso(dt) -> str:
+    return dt.isoformat().replace('+00:00', 'Z')
+
+
+class LiveBroadcaster:
+    """
+    Fans out per-region delta updates to Server-Sent Events subscribers.
+
+    `on_period_refreshed` runs once per settlement period (after the
+    recommendation scheduler's refresh), diffs each region against the previous
+    period's snapshot and serializes one event per region; every subscriber of
+    that region receives the same bytes. Upstream cost is independent of the
+    number of connected dashboards.
+
+    Every broadcast is numbered (`seq`, also sent in the hello). A client that
+    sees a gap, because its queue overflowed, the region was skipped or it
+    reconnected, refetches the full dashboard instead of applying deltas.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._snapshots: dict[str, dict] = {}
+        self.seq = 0  # number of the last broadcast
+
+    # --- Subscriptions ---
+    def subscribe(self, region: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(region.lower(), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, region: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(region.lower())
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[region.lower()]
+
+    def subscriber_counts(self) -> dict:
+        return {region: len(queues) for region, queues in self._subscribers.items()}
+
+    def _publish(self, region: str, event: bytes) -> None:
+        for queue in self._subscribers.get(region.lower(), ()):
+            if queue.full():
+                queue.get_nowait()  # drop the oldest delta rather than block the broadcast
+            queue.put_nowait(event)
+
+    # --- Period Refresh ---
+    async def on_period_refreshed(self) -> None:
+        regions = [NATIONAL, *services.CANONICAL_REGION_SHORTNAMES]
+        states = await asyncio.gather(*(self._region_state(r) for r in regions), return_exceptions=True)
+        self.seq += 1
+        for region, state in zip(regions, states):
+            if isinstance(state, Exception):
+                logger.warning(f"Live update skipped for {region}: {state}")
+                continue
+            delta = self._diff(region, state)
+            self._snapshots[region.lower()] = state
+            self._publish(region, format_event("update", delta))
+
+    async def _region_state(self, region: str) -> dict:
+        if region == NATIONAL:
+            # Fresh only, as in dashboard._collect: the delta is this period's update.
+            current, forecast, generation = await asyncio.gather(
+                services.get_national_current_intensity(fresh=True),
+                services.get_national_forecast_48h(),
+                services.get_national_current_generation(fresh=True),
+            )
+            generation_mix = generation.get('generationmix')
+        else:
+            forecast = (await services.get_regional_forecast_48h(region))['data']
+            current = await services.get_regional_current_intensity(region)
+            generation_mix = current.get('generationmix')
+        stored = recommendation_store.get(None if region == NATIONAL else region)
+        return {
+            "current": current,
+            "generationMix": generation_mix,
+            "forecast": {p['from']: p for p in forecast},
+            "recommendations": stored.payload if stored else None,
+            "recommendationsEtag": stored.etag if stored else None,
+        }
+
+    def _diff(self, region: str, state: dict) -> dict:
+        """Only what changed since the last period: new current values, changed forecast points, new recommendations."""
+        previous = self._snapshots.get(region.lower(), {})
+        old_forecast = previous.get("forecast", {})
+        delta = {
+            "region": region,
+            "seq": self.seq,
+            "periodStart": _iso(current_period_start()),
+            # Clients drop forecast points starting before `since`, then upsert the changed ones.
+            "forecast": {
+                "since": min(state["forecast"], default=None),
+                "upserts": [p for start, p in sorted(state["forecast"].items()) if old_forecast.get(start) != p],
+            },
+        }
+        for key in ("current", "generationMix"):
+            if previous.get(key) != state[key]:
+                delta[key] = state[key]
+        if state["recommendations"] is not None and previous.get("recommendationsEtag") != state["recommendationsEtag"]:
+            delta["recommendations"] = state["recommendations"]
+        return delta
+
+
+def format_event(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+async def event_stream(region: str, is_disconnected):
+    """SSE body for one subscriber: a hello, then deltas as they are broadcast, with keepalive comments."""
+    queue = live_broadcaster.subscribe(region)
+    try:
+        yield format_event("hello", {"region": region, "periodStart": _iso(current_period_start()),
+                                     "seq": live_broadcaster.seq})
+        while not await is_disconnected():
+            try:
+                yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+    finally:
+        live_broadcaster.unsubscribe(region, queue)
+
+
+live_broadcaster = LiveBroadcaster()
+
+metrics.registry.register(metrics.CallbackGauge(
+    "live_update_subscribers", "Connected Server-Sent Events subscribers per region.", "region",
+    live_broadcaster.subscriber_counts))
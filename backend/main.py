@@ -1,18 +1,48 @@
 # backend/main.py
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
+import time
 # The '.' is a relative import to bring in our router
 from . import api_router
+from .upstream_client import upstream_client
+from .recommendation_store import recommendation_scheduler
+from .model_registry import model_registry
+from . import metrics, resilience
+from .live_updates import live_broadcaster
+from .fast_json import FastJSONResponse
 
 # --- Application Setup ---
 logging.basicConfig(level=logging.INFO)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled upstream client per worker, closed cleanly on shutdown.
+    await upstream_client.start()
+    # Recommendations are precomputed for every region right after each period rollover,
+    # then the same refresh is pushed to live (SSE) subscribers as per-region deltas.
+    recommendation_scheduler.add_listener(live_broadcaster.on_period_refreshed)
+    recommendation_scheduler.start()
+    # Newly published model versions are picked up without a restart.
+    model_registry.start()
+    yield
+    await model_registry.stop()
+    await recommendation_scheduler.stop()
+    await upstream_client.close()
+
 app = FastAPI(
     title="UK Carbon Intensity API",
     description="A proxy API for the UK National Grid Carbon Intensity data.",
     version="2.5.0",
+    lifespan=lifespan,
+    # orjson renders route return values, but FastAPI runs jsonable_encoder on them first, so
+    # plain returns pay for that walk and numpy values never reach orjson. Hot routes return
+    # FastJSONResponse themselves to skip it (see api_router.py).
+    default_response_class=FastJSONResponse,
 )
 
 # --- Middleware ---
@@ -24,14 +54,47 @@ app.add_middleware(
     allow_methods=["*"], 
     allow_headers=["*"],
 )
+# Forecast and dashboard payloads are large, repetitive JSON; they compress ~10x.
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    # Send "X-Profile: 1" to get a per-stage breakdown back in a Server-Timing header.
+    profile = metrics.start_profile() if request.headers.get(metrics.PROFILE_HEADER) else None
+    # Anything served from a last-good upstream snapshot marks this scope (see resilience.py).
+    staleness = resilience.track_staleness()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        # The route template (not the raw path) keeps region names out of the label set.
+        route = request.scope.get("route")
+        metrics.http_request_duration.observe(
+            elapsed, method=request.method, route=getattr(route, "path", "unmatched"), status=status)
+    if profile is not None:
+        response.headers["Server-Timing"] = metrics.server_timing(profile, elapsed)
+    if staleness.stale:
+        response.headers.update(resilience.stale_headers(staleness))
+        # Fallback data must not be cached downstream until the period ends.
+        response.headers["Cache-Control"] = "no-cache"
+    return response
 
 # --- Routers ---
 # This line tells the main app to include all the paths
 # that we defined in the api_router.py file.
 app.include_router(api_router.router)
 
+# --- Metrics Endpoint ---
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 # --- Root Endpoint ---
 # This is a simple endpoint for health checks. It's fine to keep it here.
 @app.get("/")
-def read_root():
+async def read_root():
     return {"status": "ok", "message": "API is stable and correct."}
\ No newline at end of file
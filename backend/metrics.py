@@ -0,0 +1,161 @@
+# backend/metrics.py
+#
+# Minimal Prometheus-style metrics (counters, histograms, callback gauges)
+# rendered in the text exposition format at /metrics, plus an opt-in
+# per-request stage profile returned as a Server-Timing header.
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Header that opts a single request into stage profiling.
+PROFILE_HEADER = "x-profile"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: tuple, values: tuple, le: str | None = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if slot < len(self.buckets):
+                series[slot] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, str(bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, '+Inf')} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series[-1]}")
+        return lines
+
+
+class CallbackGauge:
+    """Gauge whose labelled values are read from a callback at scrape time."""
+
+    def __init__(self, name: str, help_text: str, label: str, callback: Callable[[], dict]):
+        self.name, self.help, self.label, self.callback = name, help_text, label, callback
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for label_value, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels((self.label,), (label_value,))} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+# --- Application Metrics ---
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Latency of API requests.", labels=("method", "route", "status")))
+upstream_request_duration = registry.register(Histogram(
+    "upstream_request_duration_seconds", "Latency of Carbon Intensity API calls.", labels=("endpoint", "outcome")))
+recommender_stage_duration = registry.register(Histogram(
+    "recommender_stage_duration_seconds", "Time spent in each recommendation pipeline stage.", labels=("stage",)))
+
+
+# --- Per-Request Stage Profiling ---
+# Holds a dict only for requests that sent the profiling header; the dict is shared
+# with worker threads (asyncio.to_thread copies the context), so their stages land in it too.
+_profile: contextvars.ContextVar[dict | None] = contextvars.ContextVar("request_profile", default=None)
+
+
+def start_profile() -> dict:
+    profile: dict[str, float] = {}
+    _profile.set(profile)
+    return profile
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    profile = _profile.get()
+    if profile is not None:
+        profile[stage] = profile.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str, histogram: Histogram = recommender_stage_duration):
+    """Times a pipeline stage into `histogram` and, if profiling is on, into the request profile."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, stage=name)
+        record_stage(name, elapsed)
+
+
+def server_timing(profile: dict, total_seconds: float) -> str:
+    """Renders a profile as a Server-Timing header value (durations in ms)."""
+    parts = [f"{name.replace(' ', '_')};dur={seconds * 1000:.2f}" for name, seconds in profile.items()]
+    parts.append(f"total;dur={total_seconds * 1000:.2f}")
+    return ", ".join(parts)
@@ -0,0 +1,181 @@
+# backend/model_registry.py
+#
+# Versioned, sklearn-free model artifacts with hot reload.
+#
+#   models/CURRENT                              name of the active version
+#   models/versions/<version>/window_model.npz  KMeans centroids + StandardScaler mean/scale
+#   models/versions/<version>/cluster_map.json  cluster id -> appliance profile
+#   models/versions/<version>/manifest.json     version metadata (training range, counts, ...)
+#
+# Inference is (x - mean) / scale followed by nearest-centroid, which is exactly
+# what StandardScaler.transform + KMeans.predict compute, so serving needs NumPy
+# only. Publishing a new version writes its directory first and then flips
+# CURRENT atomically; running workers pick it up without a restart.
+#
+#   python -m backend.model_registry export-legacy   # convert the *.pkl artifacts
+
+import asyncio
+import json
+import logging
+import os
+import pickle
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODELS_PATH = Path(__file__).resolve().parent / 'models'
+POLL_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    version: str
+    centroids: np.ndarray      # (n_clusters, n_features), in scaled space
+    scaler_mean: np.ndarray    # (n_features,)
+    scaler_scale: np.ndarray   # (n_features,)
+    cluster_map: dict[int, dict]
+    manifest: dict = field(default_factory=dict)
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        return (np.asarray(features, dtype=np.float64) - self.scaler_mean) / self.scaler_scale
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Nearest-centroid cluster id for each row of unscaled features."""
+        scaled = self.transform(features)
+        distances = ((scaled[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+
+# --- Reading & Writing Versions ---
+def load_version(version: str, models_path: Path = MODELS_PATH) -> ModelVersion:
+    root = Path(models_path) / 'versions' / version
+    with np.load(root / 'window_model.npz') as arrays:
+        centroids, mean, scale = arrays['centroids'], arrays['scaler_mean'], arrays['scaler_scale']
+    with open(root / 'cluster_map.json') as f:
+        cluster_map = {int(k): v for k, v in json.load(f).items()}
+    with open(root / 'manifest.json') as f:
+        manifest = json.load(f)
+    return ModelVersion(version, centroids, mean, scale, cluster_map, manifest)
+
+def load_legacy_pickles(models_path: Path = MODELS_PATH) -> ModelVersion:
+    """Reads the original *.pkl artifacts (needs scikit-learn installed to unpickle)."""
+    models_path = Path(models_path)
+    with open(models_path / 'window_cluster_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open(models_path / 'window_scaler.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    with open(models_path / 'cluster_to_appliance_map.pkl', 'rb') as f:
+        cluster_map = pickle.load(f)
+    return ModelVersion('legacy-pickle', np.asarray(model.cluster_centers_, dtype=np.float64),
+                        np.asarray(scaler.mean_, dtype=np.float64), np.asarray(scaler.scale_, dtype=np.float64),
+                        {int(k): v for k, v in cluster_map.items()}, {"source": "pickle"})
+
+def publish_version(centroids, scaler_mean, scaler_scale, cluster_map: dict, manifest: dict | None = None,
+                    models_path: Path = MODELS_PATH, activate: bool = True) -> str:
+    """Writes a new version directory and (by default) atomically makes it current."""
+    models_path = Path(models_path)
+    version = datetime.now(timezone.utc).strftime('v%Y%m%dT%H%M%S%fZ')
+    root = models_path / 'versions' / version
+    root.mkdir(parents=True)
+    np.savez(root / 'window_model.npz', centroids=np.asarray(centroids, dtype=np.float64),
+             scaler_mean=np.asarray(scaler_mean, dtype=np.float64),
+             scaler_scale=np.asarray(scaler_scale, dtype=np.float64))
+    with open(root / 'cluster_map.json', 'w') as f:
+        json.dump({str(k): v for k, v in cluster_map.items()}, f, indent=2)
+    with open(root / 'manifest.json', 'w') as f:
+        json.dump({"version": version, "created_at": datetime.now(timezone.utc).isoformat(),
+                   "n_clusters": len(centroids), **(manifest or {})}, f, indent=2)
+    if activate:
+        activate_version(version, models_path)
+    return version
+
+def activate_version(version: str, models_path: Path = MODELS_PATH) -> None:
+    pointer = Path(models_path) / 'CURRENT'
+    tmp = pointer.with_suffix('.tmp')
+    tmp.write_text(version + '\n')
+    os.replace(tmp, pointer)
+
+def current_version_name(models_path: Path = MODELS_PATH) -> str | None:
+    try:
+        return (Path(models_path) / 'CURRENT').read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+# --- Registry (hot reload) ---
+class ModelRegistry:
+    """
+    Holds the active ModelVersion. Callers read `registry.current` once per
+    request; a reload replaces the reference in one assignment, so an in-flight
+    request keeps the version it started with.
+    """
+
+    def __init__(self, models_path: Path = MODELS_PATH, poll_seconds: float = POLL_SECONDS):
+        self.models_path = Path(models_path)
+        self.poll_seconds = poll_seconds
+        self.current: ModelVersion | None = None
+        self._task: asyncio.Task | None = None
+
+    def load(self) -> bool:
+        """Loads the version named in CURRENT, falling back to the legacy pickles."""
+        name = current_version_name(self.models_path)
+        try:
+            self.current = load_version(name, self.models_path) if name else load_legacy_pickles(self.models_path)
+            logger.info(f"Loaded ML artifacts version '{self.current.version}' from {self.models_path}")
+            return True
+        except Exception as e:
+            logger.error(f"FATAL: An unexpected error occurred loading ML artifacts: {e}", exc_info=True)
+            return False
+
+    def reload_if_changed(self) -> bool:
+        name = current_version_name(self.models_path)
+        if name is None or (self.current is not None and name == self.current.version):
+            return False
+        try:
+            new_version = load_version(name, self.models_path)
+        except Exception as e:
+            # Keep serving the old version rather than going dark on a bad publish.
+            logger.error(f"Could not load model version '{name}', keeping the current one: {e}")
+            return False
+        self.current = new_version
+        logger.info(f"Hot-swapped ML artifacts to version '{name}'.")
+        return True
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception:
+                logger.error("Model registry poll failed.", exc_info=True)
+
+
+model_registry = ModelRegistry()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['export-legacy']:
+        legacy = load_legacy_pickles()
+        version = publish_version(legacy.centroids, legacy.scaler_mean, legacy.scaler_scale, legacy.cluster_map,
+                                  {"source": "exported from legacy pickles"})
+        print(f"Exported legacy pickles as version {version} and made it current.")
+    else:
+        print("usage: python -m backend.model_registry export-legacy")
@@ -0,0 +1,170 @@
+# backend/model_training.py
+#
+# Training helpers shared by the full rebuild (create_model_artifacts.py) and the
+# incremental update, which folds only newly collected periods into the current
+# model version instead of re-clustering the whole history:
+#
+#   1. featurize the national actuals after the version's `trained_through`, using
+#      the version's own threshold, and keep only windows that have closed;
+#   2. merge the new features into the StandardScaler mean/variance;
+#   3. map the centroids into the updated scaled space and apply count-weighted
+#      mini-batch k-means steps, seeded with each cluster's training count;
+#   4. publish the result as a new version. Centroids are updated in place and
+#      never relabelled, so the cluster -> appliance map carries over unchanged.
+#
+#   python -m backend.model_training      # e.g. scheduled right after the data collector
+
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .window_features import find_low_carbon_windows
+    from .history_store import HistoryStore, MISSING, NATIONAL, PERIOD_SECONDS
+    from .model_registry import MODELS_PATH, current_version_name, load_version, publish_version
+except ImportError:  # imported by a script run from backend/
+    from window_features import find_low_carbon_windows
+    from history_store import HistoryStore, MISSING, NATIONAL, PERIOD_SECONDS
+    from model_registry import MODELS_PATH, current_version_name, load_version, publish_version
+
+logger = logging.getLogger(__name__)
+
+# Windows shorter than this many periods are not trained on.
+MIN_PERIODS = 2
+BATCH_SIZE = 256
+
+
+class IncrementalTrainingError(Exception):
+    """The current version can't be updated incrementally; a full rebuild is needed."""
+
+
+# --- Featurization ---
+@dataclass
+class HistoryFeatures:
+    features: np.ndarray  # (n_windows, 3), finite rows only, chronological
+    threshold: float
+    resume_index: int     # store index the next incremental run starts from
+
+
+def featurize_history(actual: np.ndarray, start_index: int = 0, threshold: float | None = None) -> HistoryFeatures:
+    """
+    Features of the closed low-carbon windows in `actual[start_index:]`.
+
+    A low run still going at the last reported period may grow once more data
+    arrives, so it is left for the next run: `resume_index` points at its start
+    (or just past the last reported period when the series ends high).
+    """
+    segment = np.asarray(actual[start_index:])
+    windows = find_low_carbon_windows(segment, threshold=threshold, min_periods=MIN_PERIODS, missing_value=MISSING)
+    reported = np.flatnonzero(segment != MISSING)
+    frontier = int(reported[-1]) + 1 if len(reported) else 0
+    low = (segment[:frontier] != MISSING) & (segment[:frontier] < windows.threshold)
+    breaks = np.flatnonzero(~low)
+    resume = int(breaks[-1]) + 1 if len(breaks) else 0
+
+    features = windows.features()[windows.stop <= resume]
+    features = features[np.isfinite(features).all(axis=1)]
+    return HistoryFeatures(features, windows.threshold, start_index + resume)
+
+
+# --- Model Updates ---
+def merge_scaler(mean: np.ndarray, scale: np.ndarray, n: int, new_features: np.ndarray):
+    """StandardScaler statistics over old + new samples (pairwise mean/variance merge)."""
+    m = len(new_features)
+    total = n + m
+    delta = new_features.mean(axis=0) - mean
+    merged_mean = mean + delta * m / total
+    merged_var = (n * scale ** 2 + m * new_features.var(axis=0) + delta ** 2 * n * m / total) / total
+    # StandardScaler leaves zero-variance features unscaled.
+    merged_scale = np.where(merged_var > 0, np.sqrt(merged_var), 1.0)
+    return merged_mean, merged_scale, total
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return ((points[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+
+
+def update_centroids(centroids: np.ndarray, counts: np.ndarray, scaled: np.ndarray, batch_size: int = BATCH_SIZE):
+    """
+    Mini-batch k-means steps over `scaled` (same update as MiniBatchKMeans), with
+    each centroid weighted by the number of samples it already represents so a
+    small batch of new windows nudges, rather than replaces, the clusters.
+    """
+    centroids = centroids.astype(np.float64, copy=True)
+    counts = counts.astype(np.float64, copy=True)
+    for b in range(0, len(scaled), batch_size):
+        batch = scaled[b:b + batch_size]
+        labels = _nearest(batch, centroids)
+        n = np.bincount(labels, minlength=len(centroids)).astype(np.float64)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, batch)
+        hit = n > 0
+        centroids[hit] = (centroids[hit] * counts[hit, None] + sums[hit]) / (counts[hit] + n[hit])[:, None]
+        counts += n
+    return centroids, counts
+
+
+def ids_stable(before: np.ndarray, after: np.ndarray) -> bool:
+    """True if every updated centroid is still nearest to its own previous position."""
+    return bool((_nearest(after, before) == np.arange(len(after))).all())
+
+
+def _period_iso(store: HistoryStore, index: int) -> str:
+    return datetime.fromtimestamp(store.start + index * PERIOD_SECONDS, tz=timezone.utc).isoformat()
+
+
+def train_incremental(store: HistoryStore | None = None, models_path: Path = MODELS_PATH) -> str | None:
+    """
+    Updates the current version with the windows collected since it was trained
+    and publishes the result. Returns the new version, or None if there was nothing new.
+    """
+    name = current_version_name(models_path)
+    if name is None:
+        raise IncrementalTrainingError("No current model version; run create_model_artifacts.py first.")
+    base = load_version(name, models_path)
+    manifest = base.manifest
+    if not {'trained_through', 'cluster_counts', 'threshold'} <= manifest.keys():
+        raise IncrementalTrainingError(f"Version {name} has no incremental training metadata; run create_model_artifacts.py.")
+
+    store = store or HistoryStore()
+    start_index = store.index_range(start=datetime.fromisoformat(manifest['trained_through']))[0]
+    new = featurize_history(store.column(NATIONAL, 'actual'), start_index, threshold=manifest['threshold'])
+    if len(new.features) == 0:
+        logger.info(f"Model {name} is up to date (no closed windows since {manifest['trained_through']}).")
+        return None
+
+    n_old = int(manifest.get('scaler_n', manifest.get('trained_windows', sum(manifest['cluster_counts']))))
+    mean, scale, n_total = merge_scaler(base.scaler_mean, base.scaler_scale, n_old, new.features)
+    # Same centroids, re-expressed in the merged scaler's space.
+    seeded = (base.centroids * base.scaler_scale + base.scaler_mean - mean) / scale
+    centroids, counts = update_centroids(seeded, np.asarray(manifest['cluster_counts']), (new.features - mean) / scale)
+    if not ids_stable(seeded, centroids):
+        raise IncrementalTrainingError("Clusters drifted past each other; run create_model_artifacts.py and re-check the cluster map.")
+
+    version = publish_version(centroids, mean, scale, base.cluster_map, {
+        "mode": "incremental",
+        "base_version": name,
+        "threshold": manifest['threshold'],
+        "trained_windows": int(manifest.get('trained_windows', n_old)) + len(new.features),
+        "new_windows": len(new.features),
+        "scaler_n": n_total,
+        "cluster_counts": counts.astype(int).tolist(),
+        "trained_through": _period_iso(store, new.resume_index),
+        "n_periods": store.n_periods,
+    }, models_path=models_path)
+    logger.info(f"Published {version}: {len(new.features)} new windows folded into {name}.")
+    return version
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        published = train_incremental()
+    except (IncrementalTrainingError, FileNotFoundError, KeyError) as e:
+        print(f"Incremental training failed: {e}")
+        sys.exit(1)
+    print(f"Published version {published} and made it current." if published else "Model already up to date.")
@@ -0,0 +1,100 @@
+# backend/optimizer.py
+
+from dataclasses import dataclass
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+PERIOD_MINUTES = 30
+PERIOD_HOURS = PERIOD_MINUTES / 60
+
+
+@dataclass(frozen=True)
+class Placement:
+    start_index: int
+    n_periods: int              # settlement periods touched (the last may be partial)
+    intensity_hours: float      # sum of intensity x hours, i.e. grams CO2 per kW of load
+
+    def emissions_kg(self, power_kw: float) -> float:
+        return self.intensity_hours * power_kw / 1000
+
+    def average_intensity(self, duration_minutes: int) -> float:
+        return self.intensity_hours / (duration_minutes / 60)
+
+
+def periods_spanned(duration_minutes: int) -> int:
+    return -(-duration_minutes // PERIOD_MINUTES)
+
+
+def window_costs(intensity: np.ndarray, duration_minutes: int) -> np.ndarray:
+    """
+    Carbon cost (gCO2 per kW) of starting a job at every feasible period, via prefix sums.
+
+    Element `s` covers `duration_minutes` starting at period `s`; a trailing partial
+    period is weighted by the fraction of it the job uses. Starts whose window touches
+    a missing (NaN) period cost NaN, so a job never spans a forecast gap. O(n) for all starts.
+    """
+    k = periods_spanned(duration_minutes)
+    full, remainder = divmod(duration_minutes, PERIOD_MINUTES)
+    n_starts = len(intensity) - k + 1
+    if n_starts <= 0:
+        return np.empty(0)
+    missing = np.isnan(intensity)
+    filled = np.where(missing, 0.0, intensity)
+    prefix = np.concatenate(([0.0], np.cumsum(filled, dtype=np.float64)))
+    gaps = np.concatenate(([0], np.cumsum(missing)))
+    starts = np.arange(n_starts)
+    cost = prefix[starts + full] - prefix[starts]
+    if remainder:
+        cost = cost + filled[starts + full] * (remainder / PERIOD_MINUTES)
+    cost = cost * PERIOD_HOURS
+    cost[gaps[starts + k] > gaps[starts]] = np.nan
+    return cost
+
+
+def best_placement(intensity: np.ndarray, duration_minutes: int, costs: np.ndarray | None = None) -> Placement | None:
+    """Lowest-emission start for a single job; the earliest start wins ties."""
+    if costs is None:
+        costs = window_costs(intensity, duration_minutes)
+    if np.isnan(costs).all():
+        return None
+    start = int(np.nanargmin(costs))
+    return Placement(start, periods_spanned(duration_minutes), float(costs[start]))
+
+
+def schedule_jobs(intensity: np.ndarray, jobs: list[tuple[int, float]], power_cap_kw: float | None = None) -> list[Placement | None]:
+    """
+    Places (duration_minutes, power_kw) jobs against one intensity series.
+
+    Without a cap every job simply gets its own optimum, and jobs of equal
+    duration share one cost array. With `power_cap_kw`, jobs are placed greedily
+    in order of decreasing energy, each at the cheapest start where the load
+    already placed plus its own power stays within the cap; jobs that cannot fit
+    anywhere (including around forecast gaps) get None.
+    """
+    costs_by_duration: dict[int, np.ndarray] = {}
+
+    def costs_for(duration_minutes: int) -> np.ndarray:
+        if duration_minutes not in costs_by_duration:
+            costs_by_duration[duration_minutes] = window_costs(intensity, duration_minutes)
+        return costs_by_duration[duration_minutes]
+
+    if power_cap_kw is None:
+        return [best_placement(intensity, d, costs_for(d)) for d, _ in jobs]
+
+    placements: list[Placement | None] = [None] * len(jobs)
+    load = np.zeros(len(intensity))
+    order = sorted(range(len(jobs)), key=lambda i: jobs[i][0] * jobs[i][1], reverse=True)
+    for i in order:
+        duration_minutes, power_kw = jobs[i]
+        costs = costs_for(duration_minutes)
+        if np.isnan(costs).all() or power_kw > power_cap_kw:
+            continue
+        k = periods_spanned(duration_minutes)
+        peak_load = sliding_window_view(load, k).max(axis=1)
+        feasible = (peak_load + power_kw <= power_cap_kw + 1e-9) & ~np.isnan(costs)
+        if not feasible.any():
+            continue
+        start = int(np.argmin(np.where(feasible, costs, np.inf)))
+        load[start:start + k] += power_kw
+        placements[i] = Placement(start, k, float(costs[start]))
+    return placements
@@ -0,0 +1,162 @@
+# backend/recommendation_store.py
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from . import metrics, services
+from .fast_json import dumps
+from .resilience import FALLBACK_TTL_SECONDS, mark_stale, track_staleness
+from .model_registry import model_registry
+from .upstream_cache import current_period_start, next_period_start
+
+logger = logging.getLogger(__name__)
+
+recommendations_served = metrics.registry.register(metrics.Counter(
+    "recommendations_served_total", "Recommendation responses by where they came from.", labels=("source",)))
+
+NATIONAL = "National"
+# Give upstream a moment to publish the new period before recomputing.
+ROLLOVER_DELAY_SECONDS = 30.0
+
+
+def _key(region_shortname: str | None) -> str:
+    return (region_shortname or NATIONAL).lower()
+
+def _model_version() -> str | None:
+    return model_registry.current.version if model_registry.current else None
+
+
+@dataclass(frozen=True)
+class StoredRecommendations:
+    region: str
+    period_start: datetime
+    payload: list
+    body: bytes
+    etag: str
+    model_version: str | None
+    computed_at: datetime
+    fallback_at: float | None = None  # set when computed from a last-good upstream snapshot
+
+
+class RecommendationStore:
+    """
+    Recommendations per region for the current settlement period.
+
+    Results only change when the upstream forecast does, so they are computed
+    once per period (by RecommendationScheduler, or on demand when the store is
+    cold) and then served as-is. Concurrent cold requests for the same region
+    share one computation.
+    """
+
+    def __init__(self):
+        self._results: dict[str, StoredRecommendations] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def get(self, region_shortname: str | None) -> StoredRecommendations | None:
+        """Stored result for the current period, or None if the store is cold for it."""
+        stored = self._results.get(_key(region_shortname))
+        # A hot-swapped model invalidates results just like a period rollover does.
+        if (stored is None or stored.period_start != current_period_start()
+                or stored.model_version != _model_version()):
+            return None
+        if stored.fallback_at is not None:
+            # Built from fallback data: recompute shortly in case upstream is back.
+            if (datetime.now(timezone.utc) - stored.computed_at).total_seconds() > FALLBACK_TTL_SECONDS:
+                return None
+            mark_stale(stored.fallback_at)
+        return stored
+
+    async def get_or_compute(self, region_shortname: str | None) -> StoredRecommendations:
+        stored = self.get(region_shortname)
+        if stored is not None:
+            recommendations_served.inc(source="precomputed")
+            return stored
+        recommendations_served.inc(source="on_demand")
+        key = _key(region_shortname)
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self.compute(region_shortname))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def compute(self, region_shortname: str | None) -> StoredRecommendations:
+        """Runs the recommendation pipeline for one region and stores the result."""
+        period_start = current_period_start()
+        model_version = _model_version()
+        staleness = track_staleness()
+        payload = await services.get_appliance_recommendations(region_shortname=region_shortname)
+        # Serialized once here; every request this period is served these bytes.
+        with metrics.stage("etag"):
+            body = dumps(payload)
+        stored = StoredRecommendations(
+            region=region_shortname or NATIONAL,
+            period_start=period_start,
+            payload=payload,
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            model_version=model_version,
+            computed_at=datetime.now(timezone.utc),
+            fallback_at=staleness.fetched_at,
+        )
+        self._results[_key(region_shortname)] = stored
+        return stored
+
+    async def refresh_all(self) -> None:
+        """Recomputes National plus every canonical region concurrently."""
+        regions = [None, *services.CANONICAL_REGION_SHORTNAMES]
+        # The regional forecast is fetched once and shared through the upstream cache.
+        results = await asyncio.gather(*(self.compute(r) for r in regions), return_exceptions=True)
+        failed = [r or NATIONAL for r, result in zip(regions, results) if isinstance(result, Exception)]
+        if failed:
+            logger.warning(f"Recommendation precompute failed for: {', '.join(failed)}")
+        logger.info(f"Precomputed recommendations for {len(regions) - len(failed)}/{len(regions)} regions.")
+
+
+class RecommendationScheduler:
+    """Background task that refreshes the store right after each period rollover."""
+
+    def __init__(self, store: RecommendationStore, delay_seconds: float = ROLLOVER_DELAY_SECONDS):
+        self.store = store
+        self.delay_seconds = delay_seconds
+        self._listeners: list[Callable[[], Awaitable[None]]] = []
+        self._task: asyncio.Task | None = None
+
+    def add_listener(self, listener: Callable[[], Awaitable[None]]) -> None:
+        """Registers a coroutine function to run after every refresh (e.g. live update broadcasts)."""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.store.refresh_all()
+            except Exception:
+                logger.error("Recommendation scheduler iteration failed.", exc_info=True)
+            for listener in self._listeners:
+                try:
+                    await listener()
+                except Exception:
+                    logger.error("Recommendation scheduler listener failed.", exc_info=True)
+            now = datetime.now(timezone.utc)
+            wait = (next_period_start(now) - now).total_seconds() + self.delay_seconds
+            await asyncio.sleep(wait)
+
+
+recommendation_store = RecommendationStore()
+recommendation_scheduler = RecommendationScheduler(recommendation_store)
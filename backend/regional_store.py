@@ -0,0 +1,114 @@
+# backend/regional_store.py
+
+import threading
+import numpy as np
+
+MISSING_FORECAST = -1
+
+
+class RegionalForecastStore:
+    """
+    Region-indexed, columnar view of one `/regional/intensity/{from}/{to}` payload.
+
+    The payload covers every region for every period, so it is parsed once per
+    settlement period into dense arrays of shape (regions, periods) and any
+    region's forecast or "current" slice becomes an index lookup.
+    """
+
+    def __init__(self, froms, tos, region_names, forecast, index_codes, index_labels, fuels, mix):
+        self.froms = froms                # list[str], length P
+        self.tos = tos                    # list[str], length P
+        self.region_names = region_names  # list[str], length R (as reported upstream)
+        self.forecast = forecast          # int32 (R, P), MISSING_FORECAST where absent
+        self.index_codes = index_codes    # int8 (R, P), codes into index_labels
+        self.index_labels = index_labels  # list[str]
+        self.fuels = fuels                # list[str], length F
+        self.mix = mix                    # float64 (R, P, F)
+        self._row_by_name = {name.lower(): row for row, name in enumerate(region_names)}
+        self._slices: dict[int, list] = {}
+        self._slices_lock = threading.Lock()
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "RegionalForecastStore":
+        periods = payload.get('data', []) if payload else []
+        froms = [p['from'] for p in periods]
+        tos = [p['to'] for p in periods]
+
+        region_rows: dict[str, int] = {}
+        region_names: list[str] = []
+        fuel_cols: dict[str, int] = {}
+        label_codes: dict[str, int] = {}
+        for period in periods:
+            for entry in period.get('regions', []):
+                name = entry.get('shortname')
+                if name and name.lower() not in region_rows:
+                    region_rows[name.lower()] = len(region_names)
+                    region_names.append(name)
+                for mix_entry in entry.get('generationmix', []):
+                    fuel_cols.setdefault(mix_entry['fuel'], len(fuel_cols))
+
+        n_regions, n_periods, n_fuels = len(region_names), len(periods), len(fuel_cols)
+        forecast = np.full((n_regions, n_periods), MISSING_FORECAST, dtype=np.int32)
+        index_codes = np.zeros((n_regions, n_periods), dtype=np.int8)
+        mix = np.zeros((n_regions, n_periods, n_fuels), dtype=np.float64)
+
+        for col, period in enumerate(periods):
+            for entry in period.get('regions', []):
+                name = entry.get('shortname')
+                if not name:
+                    continue
+                row = region_rows[name.lower()]
+                intensity = entry.get('intensity') or {}
+                if intensity.get('forecast') is not None:
+                    forecast[row, col] = intensity['forecast']
+                label = intensity.get('index', '')
+                index_codes[row, col] = label_codes.setdefault(label, len(label_codes))
+                for mix_entry in entry.get('generationmix', []):
+                    mix[row, col, fuel_cols[mix_entry['fuel']]] = mix_entry['perc']
+
+        return cls(froms, tos, region_names, forecast, index_codes, list(label_codes),
+                   list(fuel_cols), mix)
+
+    def __len__(self) -> int:
+        return len(self.froms)
+
+    def region_row(self, region_shortname: str) -> int | None:
+        return self._row_by_name.get(region_shortname.lower())
+
+    def canonical_name(self, region_shortname: str) -> str | None:
+        """The region's name as reported upstream, for any casing of it."""
+        row = self.region_row(region_shortname)
+        return None if row is None else self.region_names[row]
+
+    def intensities(self, region_shortname: str) -> np.ndarray | None:
+        """Forecast intensities for a region (MISSING_FORECAST where absent)."""
+        row = self.region_row(region_shortname)
+        return None if row is None else self.forecast[row]
+
+    def forecast_periods(self, region_shortname: str) -> list | None:
+        """The region's periods in the legacy per-period dict format, built once per store."""
+        row = self.region_row(region_shortname)
+        if row is None:
+            return None
+        periods = self._slices.get(row)
+        if periods is None:
+            with self._slices_lock:
+                periods = self._slices.get(row)
+                if periods is None:
+                    periods = self._slices[row] = self._build_periods(row)
+        return periods
+
+    def _build_periods(self, row: int) -> list:
+        name = self.region_names[row]
+        forecast, codes, mix = self.forecast[row].tolist(), self.index_codes[row].tolist(), self.mix[row].tolist()
+        periods = []
+        for col, value in enumerate(forecast):
+            if value == MISSING_FORECAST:
+                continue
+            periods.append({
+                "from": self.froms[col], "to": self.tos[col],
+                "intensity": {"forecast": value, "index": self.index_labels[codes[col]]},
+                "generationmix": [{"fuel": fuel, "perc": perc} for fuel, perc in zip(self.fuels, mix[col])],
+                "region_name": name,
+            })
+        return periods
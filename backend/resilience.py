@@ -0,0 +1,261 @@
+# backend/resilience.py
+#
+# Failure handling around upstream access: a deadline per fetch, jittered retries,
+# a circuit breaker, and a persisted last-good snapshot per endpoint, plus the
+# per-request bookkeeping that lets responses built from that snapshot say so.
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+import orjson
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(__file__).resolve().parent / 'data' / 'snapshots'
+# Header set on responses assembled (partly) from last-good snapshots.
+STALE_HEADER = "X-Data-Stale"
+STALE_AGE_HEADER = "X-Data-Age"
+# Values derived from a snapshot are cached this long, instead of until the period ends,
+# so recovery is picked up promptly.
+FALLBACK_TTL_SECONDS = 30.0
+
+upstream_retries = metrics.registry.register(metrics.Counter(
+    "upstream_retries_total", "Upstream attempts retried after a transient failure.", labels=("endpoint",)))
+upstream_fallbacks = metrics.registry.register(metrics.Counter(
+    "upstream_fallbacks_total", "Upstream fetches answered from the last-good snapshot.", labels=("endpoint",)))
+
+
+class UpstreamUnavailable(Exception):
+    """Upstream could not be reached within the deadline, or the circuit is open."""
+
+
+# --- Retry Policy ---
+@dataclass(frozen=True)
+class RetryPolicy:
+    deadline_seconds: float = 9.0         # hard cap on one fetch, including retries and queueing
+    attempt_timeout_seconds: float = 4.0  # per attempt, clipped to the remaining deadline
+    max_attempts: int = 3
+    backoff_base_seconds: float = 0.2
+    backoff_max_seconds: float = 2.0
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, base * 2^attempt], so retrying clients don't synchronize.
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+
+
+def is_retryable(error: Exception) -> bool:
+    # A body that isn't JSON (a truncated response, a proxy's error page) is an upstream failure too.
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, json.JSONDecodeError, UnicodeDecodeError)):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return False
+
+
+# --- Circuit Breaker ---
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker. After `failure_threshold` failed fetches
+    the circuit opens and calls fail fast for `reset_seconds`; then one probe is
+    let through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at < self.reset_seconds:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Upstream circuit closed.")
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def release(self) -> None:
+        """Gives up a probe slot without an outcome (the caller was cancelled)."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            if self._opened_at is None or self._probing:
+                logger.warning(f"Upstream circuit opened after {self._failures} consecutive failures.")
+            self._opened_at = self._clock()
+        self._probing = False
+
+
+async def call_with_retries(attempt: Callable[[], Awaitable[Any]], policy: RetryPolicy, breaker: CircuitBreaker,
+                            endpoint: str = "") -> Any:
+    """
+    Runs `attempt` under the policy's deadline, retrying transient failures with
+    jittered backoff. Raises UpstreamUnavailable when the circuit is open or every
+    attempt failed; non-retryable errors (e.g. a 404) propagate unchanged.
+    """
+    if not breaker.allow():
+        raise UpstreamUnavailable("circuit open")
+    deadline = time.monotonic() + policy.deadline_seconds
+    last_error: Exception | None = None
+    try:
+        for n in range(policy.max_attempts):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = await asyncio.wait_for(attempt(), timeout=min(policy.attempt_timeout_seconds, remaining))
+            except Exception as e:
+                if not is_retryable(e):
+                    breaker.record_success()  # upstream answered; the request itself was bad
+                    raise
+                last_error = e
+            else:
+                breaker.record_success()
+                return result
+            pause = policy.backoff(n)
+            if n + 1 == policy.max_attempts or time.monotonic() + pause >= deadline:
+                break
+            upstream_retries.inc(endpoint=endpoint)
+            await asyncio.sleep(pause)
+    except asyncio.CancelledError:
+        breaker.release()
+        raise
+    breaker.record_failure()
+    raise UpstreamUnavailable(repr(last_error) if last_error else "deadline exceeded")
+
+
+# --- Last-Good Snapshots ---
+def snapshot_key(url: str) -> str:
+    # Period-stamped URLs change every half hour; the snapshot for "the 48h forecast" must not.
+    return re.sub(r'/\d{4}-\d{2}-\d{2}T[^/]*', '/{datetime}', url)
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    payload: Any
+    fetched_at: float  # epoch seconds
+
+
+class SnapshotStore:
+    """
+    Last successfully fetched payload per endpoint, kept in memory and persisted
+    as one JSON file per endpoint so a restart during an outage can still serve it.
+    """
+
+    def __init__(self, root: Path = SNAPSHOT_DIR):
+        self.root = Path(root)
+        self._memory: dict[str, Snapshot] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    async def save(self, url: str, payload: Any) -> None:
+        key = snapshot_key(url)
+        snapshot = self._memory[key] = Snapshot(payload, time.time())
+        try:
+            await asyncio.to_thread(self._write, key, snapshot)
+        except OSError as e:
+            logger.warning(f"Could not persist upstream snapshot for {key}: {e}")
+
+    def _write(self, key: str, snapshot: Snapshot) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(orjson.dumps({"key": key, "fetched_at": snapshot.fetched_at, "payload": snapshot.payload}))
+        os.replace(tmp, path)
+
+    async def load(self, url: str) -> Snapshot | None:
+        key = snapshot_key(url)
+        snapshot = self._memory.get(key)
+        if snapshot is None:
+            snapshot = await asyncio.to_thread(self._read, key)
+            if snapshot is not None:
+                self._memory[key] = snapshot
+        return snapshot
+
+    def _read(self, key: str) -> Snapshot | None:
+        try:
+            stored = orjson.loads(self._path(key).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        return Snapshot(stored["payload"], stored["fetched_at"])
+
+
+# --- Staleness Tracking ---
+class Staleness:
+    """
+    Collects whether anything a computation used came from a snapshot, and the
+    oldest such fetch time. Scopes chain to the enclosing one, so a cache flight
+    that falls back also marks the request (or outer flight) that started it.
+    """
+
+    def __init__(self, parent: "Staleness | None" = None):
+        self.parent = parent
+        self.fetched_at: float | None = None
+
+    @property
+    def stale(self) -> bool:
+        return self.fetched_at is not None
+
+    def mark(self, fetched_at: float) -> None:
+        scope = self
+        while scope is not None:
+            scope.fetched_at = fetched_at if scope.fetched_at is None else min(scope.fetched_at, fetched_at)
+            scope = scope.parent
+
+
+# Shared by reference with tasks and threads spawned from the request, like metrics' profile.
+_staleness: contextvars.ContextVar[Staleness | None] = contextvars.ContextVar("data_staleness", default=None)
+
+
+def track_staleness() -> Staleness:
+    """Opens a staleness scope in the current context (a request, or a cache flight's task)."""
+    scope = Staleness(_staleness.get())
+    _staleness.set(scope)
+    return scope
+
+
+def mark_stale(fetched_at: float) -> None:
+    scope = _staleness.get()
+    if scope is not None:
+        scope.mark(fetched_at)
+
+
+def stale_headers(scope: Staleness) -> dict:
+    if not scope.stale:
+        return {}
+    return {STALE_HEADER: "true", STALE_AGE_HEADER: str(max(int(time.time() - scope.fetched_at), 0))}
@@ -1,16 +1,28 @@
 # backend/services.py (Final, Architecturally Correct Version)
 
-import requests
+import asyncio
+import httpx
 from fastapi import HTTPException
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timedelta
 import logging
-import pandas as pd
+import os
+import re
+import time
 import numpy as np
-import pickle
-from pathlib import Path
+from . import metrics
+from .upstream_client import upstream_client
+from .upstream_cache import UpstreamCache, current_period_start
+from .regional_store import RegionalForecastStore, MISSING_FORECAST
+from .optimizer import Placement, best_placement, schedule_jobs, window_costs
+from .window_features import find_low_carbon_windows
+from .model_registry import ModelVersion, model_registry
+from .history_rollups import HistoryRollups, open_rollups
+from .resilience import (CircuitBreaker, RetryPolicy, SnapshotStore, UpstreamUnavailable, call_with_retries,
+                         mark_stale, upstream_fallbacks)
 
 # --- Constants, Model Loading ---
-API_BASE_URL = "https://api.carbonintensity.org.uk"
+# Overridable so benchmarks can point the service at a local stand-in (see benchmarks/fake_upstream.py).
+API_BASE_URL = os.environ.get("CARBON_INTENSITY_API_URL", "https://api.carbonintensity.org.uk")
 CANONICAL_REGION_SHORTNAMES = sorted([
     "East England", "East Midlands", "London", "North East England",
     "North Scotland", "North West England", "South East England",
@@ -18,151 +30,388 @@ CANONICAL_REGION_SHORTNAMES = sorted([
 ])
 logger = logging.getLogger(__name__)
 
-try:
-    BASE_DIR = Path(__file__).resolve().parent
-    MODELS_PATH = BASE_DIR / 'models'
-    
-    logger.info(f"Loading ML artifacts from: {MODELS_PATH}")
-    model = pickle.load(open(MODELS_PATH / 'window_cluster_model.pkl', 'rb'))
-    scaler = pickle.load(open(MODELS_PATH / 'window_scaler.pkl', 'rb'))
-    cluster_map = pickle.load(open(MODELS_PATH / 'cluster_to_appliance_map.pkl', 'rb'))
-    
-    ML_ARTIFACTS_LOADED = True
-    logger.info("Machine learning artifacts loaded successfully.")
-except Exception as e:
-    logger.error(f"FATAL: An unexpected error occurred loading ML artifacts: {e}", exc_info=True)
-    ML_ARTIFACTS_LOADED = False
+# Upstream data only changes every settlement period, so every URL is cached
+# until the next half-hour boundary (see upstream_cache.py).
+upstream_cache = UpstreamCache()
+# Parsed, region-indexed regional forecasts share the same per-period lifetime.
+regional_store_cache = UpstreamCache()
+
+# Upstream failure handling: bounded retries, fail-fast when down, last-good fallback (see resilience.py).
+upstream_retry_policy = RetryPolicy()
+upstream_breaker = CircuitBreaker()
+snapshot_store = SnapshotStore()
+
+metrics.registry.register(metrics.CallbackGauge(
+    "upstream_circuit_state", "1 for the upstream circuit breaker's current state.", "state",
+    lambda: {state: int(upstream_breaker.state == state)
+             for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN)}))
+metrics.registry.register(metrics.CallbackGauge(
+    "upstream_cache", "Upstream response cache counters (see /api/v1/cache/stats).", "stat",
+    lambda: {k: v for k, v in upstream_cache.stats().items() if isinstance(v, (int, float))}))
+
+# Versioned model artifacts, hot-reloaded by the app lifespan (see model_registry.py).
+model_registry.load()
 
 # --- Core Data Access (Shared & Robust) ---
-def fetch_from_api(url: str):
+async def fetch_from_api(url: str, allow_stale: bool = True):
+    """
+    Cached, single-flight access to the Carbon Intensity API. Pass `allow_stale=False`
+    when the result feeds a per-period aggregate, so a URL that isn't period-stamped
+    can't carry the previous period's value into it after a rollover.
+    """
+    return await upstream_cache.get(url, lambda: _fetch_from_api_uncached(url), allow_stale=allow_stale)
+
+def _upstream_endpoint_label(url: str) -> str:
+    # Timestamps and region names would explode metric cardinality; keep the route shape only.
+    path = url.removeprefix(API_BASE_URL)
+    return re.sub(r'/\d{4}-\d{2}-\d{2}T[^/]*', '/{datetime}', path)
+
+async def _fetch_from_api_uncached(url: str):
+    """
+    One upstream fetch under the retry policy and circuit breaker. When upstream is
+    unavailable the last-good snapshot is served instead (and the request marked stale).
+    """
+    endpoint = _upstream_endpoint_label(url)
+    try:
+        payload = await call_with_retries(lambda: _fetch_once(url, endpoint), upstream_retry_policy, upstream_breaker, endpoint)
+    except (UpstreamUnavailable, httpx.HTTPError) as e:
+        snapshot = await snapshot_store.load(url)
+        if snapshot is None:
+            logger.error(f"External API request error for {url}: {e}")
+            raise HTTPException(status_code=503, detail="Error communicating with the Carbon Intensity API.")
+        logger.warning(f"Serving last-good data for {endpoint} fetched {int(time.time() - snapshot.fetched_at)}s ago: {e}")
+        upstream_fallbacks.inc(endpoint=endpoint)
+        mark_stale(snapshot.fetched_at)
+        return snapshot.payload
+    await snapshot_store.save(url, payload)
+    return payload
+
+async def _fetch_once(url: str, endpoint: str):
+    started = time.perf_counter()
+    outcome = "error"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        response = await upstream_client.get(url)
+        outcome = "ok"
         return response.json() if response.text != 'null' else {}
-    except requests.exceptions.RequestException as e:
-        logger.error(f"External API request error for {url}: {e}")
-        raise HTTPException(status_code=503, detail="Error communicating with the Carbon Intensity API.")
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.upstream_request_duration.observe(elapsed, endpoint=endpoint, outcome=outcome)
+        metrics.record_stage("upstream", elapsed)
 
-def get_national_forecast_48h():
+async def get_national_forecast_48h():
     """Service to get the 48-hour national forecast. (RESTORED)"""
-    now_utc = datetime.now(timezone.utc)
-    from_iso = now_utc.isoformat().replace('+00:00', 'Z')
-    data = fetch_from_api(f"{API_BASE_URL}/intensity/{from_iso}/fw48h")
+    # Anchored to the period start so every request in a period shares one cache key.
+    from_iso = current_period_start().isoformat().replace('+00:00', 'Z')
+    data = await fetch_from_api(f"{API_BASE_URL}/intensity/{from_iso}/fw48h")
     return data.get('data', [])
 
-def get_regional_forecast_48h(region_shortname: str):
-    """Service to get the 48-hour forecast for a specific region. (RESTORED and FIXED)"""
-    now_utc = datetime.now(timezone.utc)
-    minutes_past_half_hour = now_utc.minute % 30
-    start_time = now_utc - timedelta(minutes=minutes_past_half_hour, seconds=now_utc.second, microseconds=now_utc.microsecond)
+async def get_regional_forecast_store() -> RegionalForecastStore:
+    """
+    Fetches the all-regions 48h forecast once per settlement period and indexes it
+    by region, so every regional endpoint shares one upstream call.
+    """
+    start_time = current_period_start()
     end_time = start_time + timedelta(hours=48)
     
     from_iso = start_time.isoformat().replace('+00:00', 'Z')
     to_iso = end_time.isoformat().replace('+00:00', 'Z')
     
     url = f"{API_BASE_URL}/regional/intensity/{from_iso}/{to_iso}"
-    api_response = fetch_from_api(url)
+    store = await regional_store_cache.get(url, lambda: _build_regional_store(url))
 
-    if not api_response or 'data' not in api_response:
+    if len(store) == 0:
         raise HTTPException(status_code=404, detail="No forecast data received from the external API for any region.")
+    return store
+
+async def _build_regional_store(url: str) -> RegionalForecastStore:
+    payload = await fetch_from_api(url)
+    # Parsing ~1.6k region-period entries is CPU work; keep it off the event loop.
+    return await asyncio.to_thread(RegionalForecastStore.from_payload, payload)
+
+async def canonical_region_name(region_shortname: str) -> str:
+    """Upstream's spelling of a region (any casing accepted); 404 for unknown regions."""
+    name = (await get_regional_forecast_store()).canonical_name(region_shortname)
+    if name is None:
+        raise HTTPException(status_code=404, detail=f"No forecast data available for region '{region_shortname}'.")
+    return name
 
-    forecast_periods_for_target_region = []
-    for period_data in api_response['data']:
-        if 'regions' in period_data:
-            for region_entry in period_data['regions']:
-                # *** THIS IS THE CRITICAL BUG FIX APPLIED TO THE SHARED FUNCTION ***
-                current_shortname = region_entry.get('shortname')
-                if current_shortname and current_shortname.lower() == region_shortname.lower():
-                    forecast_periods_for_target_region.append({
-                        "from": period_data['from'], "to": period_data['to'],
-                        "intensity": region_entry['intensity'],
-                        "generationmix": region_entry.get('generationmix', []),
-                        "region_name": region_entry.get('shortname')
-                    })
+async def get_regional_forecast_48h(region_shortname: str):
+    """Service to get the 48-hour forecast for a specific region."""
+    forecast_periods_for_target_region = (await get_regional_forecast_store()).forecast_periods(region_shortname)
     
     if not forecast_periods_for_target_region:
         raise HTTPException(status_code=404, detail=f"No forecast data available for region '{region_shortname}'.")
 
     return {"region_name": region_shortname, "data": forecast_periods_for_target_region}
 
+async def get_regional_current_intensity(region_shortname: str):
+    """Service to get a region's current intensity and generation mix (the first forecast period)."""
+    regional_forecast = await get_regional_forecast_48h(region_shortname)
+    first_period = regional_forecast['data'][0]
+    return {
+        "region_name": regional_forecast['region_name'],
+        "from": first_period['from'],
+        "to": first_period['to'],
+        "intensity": first_period['intensity'],
+        "generationmix": first_period['generationmix'],
+    }
+
+# --- Columnar Forecasts (parallel arrays; opt-in via ?format=columnar) ---
+async def get_national_forecast_columnar():
+    """The national 48h forecast as parallel arrays, one entry per period."""
+    periods = await get_national_forecast_48h()
+    intensities = [p.get('intensity') or {} for p in periods]
+    return {
+        "from": [p['from'] for p in periods],
+        "to": [p['to'] for p in periods],
+        "forecast": [i.get('forecast') for i in intensities],
+        "actual": [i.get('actual') for i in intensities],
+        "index": [i.get('index') for i in intensities],
+    }
+
+async def get_regional_forecast_columnar(region_shortname: str):
+    """
+    A region's 48h forecast as parallel arrays straight from the columnar store,
+    with the generation mix as one array per fuel. Contains numpy arrays, so it
+    must be serialized with fast_json.dumps.
+    """
+    store = await get_regional_forecast_store()
+    row = store.region_row(region_shortname)
+    valid = None if row is None else store.forecast[row] != MISSING_FORECAST
+    if valid is None or not valid.any():
+        raise HTTPException(status_code=404, detail=f"No forecast data available for region '{region_shortname}'.")
+    mix_by_fuel = np.ascontiguousarray(store.mix[row][valid].T)
+    return {
+        "region_name": region_shortname,
+        "from": [f for f, ok in zip(store.froms, valid) if ok],
+        "to": [t for t, ok in zip(store.tos, valid) if ok],
+        "forecast": store.forecast[row][valid],
+        "index": [store.index_labels[c] for c in store.index_codes[row][valid].tolist()],
+        "generationmix": dict(zip(store.fuels, mix_by_fuel)),
+    }
+
+
+async def get_forecast_series(region_shortname: str | None = None):
+    """
+    The 48h forecast as (intensity float array, period starts, period ends) on the
+    half-hour grid, with NaN where a period has no forecast. National when
+    `region_shortname` is None.
+    """
+    if region_shortname:
+        store = await get_regional_forecast_store()
+        intensities = store.intensities(region_shortname)
+        if intensities is None:
+            raise HTTPException(status_code=404, detail=f"No forecast data available for region '{region_shortname}'.")
+        series = np.where(intensities == MISSING_FORECAST, np.nan, intensities.astype(np.float64))
+        return series, list(store.froms), list(store.tos)
+
+    periods = [p for p in await get_national_forecast_48h() if p.get('from')]
+    if not periods:
+        return np.empty(0), [], []
+    starts = [datetime.fromisoformat(p['from'].replace('Z', '+00:00')) for p in periods]
+    # Upstream may leave periods out entirely; put every entry back on its grid slot.
+    slots = [int((t - starts[0]).total_seconds() // 1800) for t in starts]
+    n = slots[-1] + 1
+    series = np.full(n, np.nan)
+    froms = [(starts[0] + timedelta(minutes=30 * i)).strftime('%Y-%m-%dT%H:%MZ') for i in range(n)]
+    tos = froms[1:] + [(starts[0] + timedelta(minutes=30 * n)).strftime('%Y-%m-%dT%H:%MZ')]
+    for slot, p in zip(slots, periods):
+        forecast = (p.get('intensity') or {}).get('forecast')
+        if forecast is not None:
+            series[slot] = forecast
+        froms[slot], tos[slot] = p['from'], p.get('to', tos[slot])
+    return series, froms, tos
+
 
 # --- Smart Recommender Service (Correctly using shared helpers) ---
-def get_appliance_recommendations(region_shortname: str | None = None):
-    if not ML_ARTIFACTS_LOADED:
+async def get_appliance_recommendations(region_shortname: str | None = None):
+    # Pin the model version for the whole request, even if a hot reload happens meanwhile.
+    model = model_registry.current
+    if model is None:
         raise HTTPException(status_code=500, detail="Recommendation engine is offline: ML artifacts not loaded.")
 
     try:
-        # Step 1: Fetch Data using the restored, robust helper functions
-        if region_shortname:
-            # The .get('data', []) handles cases where the region might not be found
-            forecast_data = get_regional_forecast_48h(region_shortname).get('data', [])
-        else:
-            forecast_data = get_national_forecast_48h()
-
-        # Step 2: Unified Processing Pipeline (from here on, the code is safe)
-        if not forecast_data or len(forecast_data) < 2:
-            return []
-
-        df = pd.DataFrame(forecast_data)
-        
-        def safe_get_forecast(x):
-            return x.get('forecast') if isinstance(x, dict) else None
-
-        df['intensity'] = df['intensity'].apply(safe_get_forecast)
-        df.dropna(subset=['intensity'], inplace=True)
-        if df.empty: return []
-        df['intensity'] = df['intensity'].astype(int)
-
-        mean_intensity = df['intensity'].mean()
-        df['is_low'] = df['intensity'] < mean_intensity
-        df['window_id'] = (df['is_low'] != df['is_low'].shift()).cumsum()
-        low_carbon_windows = df[df['is_low']]
-        if low_carbon_windows.empty: return []
-
-        window_features = []
-        for _, group in low_carbon_windows.groupby('window_id'):
-            window_features.append({
-                'duration': len(group) * 30,
-                'depth': (mean_intensity - group['intensity'].mean()) / mean_intensity if mean_intensity > 0 else 0,
-                'stability': group['intensity'].std(ddof=0),
-                'start_time': group['from'].iloc[0], 'end_time': group['to'].iloc[-1],
-                'avg_intensity': round(group['intensity'].mean(), 2)
-            })
-        
-        if not window_features: return []
-        features_df = pd.DataFrame(window_features)
-        
-        features_df.replace([np.inf, -np.inf], np.nan, inplace=True)
-        features_df.dropna(subset=['duration', 'depth', 'stability'], inplace=True)
-        if features_df.empty: return []
-
-        features_to_scale = features_df[['duration', 'depth', 'stability']]
-        scaled_features = scaler.transform(features_to_scale)
-        predictions = model.predict(scaled_features)
-        features_df['cluster_id'] = predictions
-
-        recommendations = []
-        for _, row in features_df.iterrows():
-            appliance_profile = cluster_map.get(row['cluster_id'])
-            if appliance_profile:
-                recommendations.append({
-                    "appliance": appliance_profile,
-                    "window": { "startTime": row['start_time'], "endTime": row['end_time'], "durationMinutes": int(row['duration']), "averageIntensity": row['avg_intensity'] },
-                    "cluster_id": int(row['cluster_id'])
-                })
-        
-        recommendations.sort(key=lambda x: x['window']['startTime'])
-        return recommendations
+        # Step 1: Fetch Data as a dense intensity array plus period boundaries
+        with metrics.stage("fetch"):
+            intensity, froms, tos = await get_forecast_series(region_shortname)
+
+        # Step 2: Feature engineering and inference are CPU-bound; run them in a worker thread.
+        return await asyncio.to_thread(_recommend_from_forecast, intensity, froms, tos, model)
 
     except Exception as e:
         logger.error(f"--- RECOMMENDATION ENGINE CRASH ---", exc_info=True)
         raise HTTPException(status_code=500, detail="A critical internal error occurred in the recommendation engine.")
 
+def _recommend_from_forecast(intensity: np.ndarray, froms: list, tos: list, model: ModelVersion):
+    """
+    Unified processing pipeline shared by national and regional forecasts: one
+    batched window segmentation and one vectorized scale + nearest-centroid predict.
+    Missing (NaN) periods split windows rather than being bridged.
+    """
+    if len(intensity) < 2:
+        return []
+
+    with metrics.stage("featurize"):
+        windows = find_low_carbon_windows(intensity)
+        features = windows.features()
+        usable = np.isfinite(features).all(axis=1)
+    if not usable.any(): return []
+
+    with metrics.stage("predict"):
+        predictions = model.predict(features[usable])
+
+    with metrics.stage("serialize"):
+        return _build_recommendations(windows, usable, predictions, froms, tos, model)
+
+def _build_recommendations(windows, usable: np.ndarray, predictions: np.ndarray, froms: list, tos: list, model: ModelVersion):
+    recommendations = []
+    # Windows come out of the segmentation in chronological order.
+    for i, cluster_id in zip(np.flatnonzero(usable).tolist(), predictions.tolist()):
+        appliance_profile = model.cluster_map.get(cluster_id)
+        if appliance_profile:
+            recommendations.append({
+                "appliance": appliance_profile,
+                "window": {
+                    "startTime": froms[windows.start[i]], "endTime": tos[windows.stop[i] - 1],
+                    "durationMinutes": int(windows.duration[i]), "averageIntensity": round(float(windows.mean[i]), 2),
+                },
+                "cluster_id": int(cluster_id)
+            })
+    return recommendations
+
+# --- Best-Time Optimizer (sliding-window minimum over the 48h forecast) ---
+def _format_placement(placement: Placement, froms: list, duration_minutes: int, power_kw: float, now_cost: float | None):
+    start = datetime.fromisoformat(froms[placement.start_index].replace('Z', '+00:00'))
+    end = start + timedelta(minutes=duration_minutes)
+    emissions_kg = placement.emissions_kg(power_kw)
+    result = {
+        "startTime": froms[placement.start_index],
+        "endTime": end.strftime('%Y-%m-%dT%H:%MZ'),
+        "averageIntensity": round(placement.average_intensity(duration_minutes), 2),
+        "estimatedEmissionsKg": round(emissions_kg, 4),
+    }
+    if now_cost is not None:
+        now_kg = now_cost * power_kw / 1000
+        result["emissionsIfStartedNowKg"] = round(now_kg, 4)
+        result["savingsKg"] = round(now_kg - emissions_kg, 4)
+    return result
+
+async def find_best_time_logic(duration_minutes: int, power_kw: float, region_shortname: str | None = None):
+    """Service to find the lowest-emission start time for a single job."""
+    intensity, froms, _ = await get_forecast_series(region_shortname)
+    costs = window_costs(intensity, duration_minutes)
+    placement = best_placement(intensity, duration_minutes, costs)
+    if placement is None:
+        raise HTTPException(status_code=400, detail=f"A {duration_minutes}-minute job does not fit in the available forecast horizon.")
+    return {
+        "region_name": region_shortname or "National",
+        "duration_minutes": duration_minutes,
+        "power_kw": power_kw,
+        # Starting now isn't an option when the first window runs into a forecast gap.
+        **_format_placement(placement, froms, duration_minutes, power_kw, None if np.isnan(costs[0]) else float(costs[0])),
+    }
+
+async def find_best_time_batch(jobs: list[dict], power_cap_kw: float | None = None):
+    """
+    Service to place many (duration, power, region) jobs at once. Each distinct
+    region's forecast is fetched once; with `power_cap_kw`, jobs in the same
+    region share that power budget (see optimizer.schedule_jobs).
+    """
+    # Region names are case-insensitive; group on the lower-cased name, report the first spelling seen.
+    regions: dict[str, str] = {}
+    for job in jobs:
+        regions.setdefault((job.get('region_shortname') or '').lower(), job.get('region_shortname') or '')
+    series = await asyncio.gather(*(get_forecast_series(name or None) for name in regions.values()))
+
+    results: list[dict | None] = [None] * len(jobs)
+    for (key, name), (intensity, froms, _) in zip(regions.items(), series):
+        indices = [i for i, job in enumerate(jobs) if (job.get('region_shortname') or '').lower() == key]
+        specs = [(jobs[i]['duration_minutes'], jobs[i]['power_kw']) for i in indices]
+        placements = await asyncio.to_thread(schedule_jobs, intensity, specs, power_cap_kw)
+        for i, placement, (duration_minutes, power_kw) in zip(indices, placements, specs):
+            entry = {"job_id": jobs[i].get('job_id'), "region_name": name or "National",
+                     "duration_minutes": duration_minutes, "power_kw": power_kw, "scheduled": placement is not None}
+            if placement is not None:
+                entry.update(_format_placement(placement, froms, duration_minutes, power_kw, None))
+            results[i] = entry
+    return {"power_cap_kw": power_cap_kw, "jobs": results}
+
+
 # --- Other service functions that depend on the helpers being present ---
-def get_national_current_intensity():
-    data = fetch_from_api(f"{API_BASE_URL}/intensity")
+async def get_national_current_intensity(fresh: bool = False):
+    data = await fetch_from_api(f"{API_BASE_URL}/intensity", allow_stale=not fresh)
     return data.get('data', [{}])[0]
 
-def get_national_current_generation():
-    data = fetch_from_api(f"{API_BASE_URL}/generation")
-    return data.get('data', {})
\ No newline at end of file
+async def get_national_current_generation(fresh: bool = False):
+    data = await fetch_from_api(f"{API_BASE_URL}/generation", allow_stale=not fresh)
+    return data.get('data', {})
+
+
+# --- Historical Analytics (served from precomputed daily rollups, see history_rollups.py) ---
+def _history_rollups() -> HistoryRollups:
+    rollups = open_rollups()
+    if rollups is None:
+        raise HTTPException(status_code=503, detail="Historical analytics are unavailable: run the data collector to build the rollups.")
+    return rollups
+
+def _history_query(series: str, field: str | None, start: date | None, end: date | None):
+    """Validated (rollups, series, field, envelope) for a per-series query."""
+    if start and end and start > end:
+        raise HTTPException(status_code=422, detail="'start' must not be after 'end'.")
+    rollups = _history_rollups()
+    try:
+        name, field = rollups.resolve(series, field)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    d0, d1 = rollups.day_range(start, end)
+    envelope = {"series": name, "field": field, "start": str(rollups.first_day + timedelta(days=d0)),
+                "end": str(rollups.first_day + timedelta(days=d1 - 1)), "dayCount": max(d1 - d0, 0)}
+    return rollups, name, field, envelope
+
+# Opening the rollups and slicing them is file I/O plus numpy work; the public
+# services run it in a worker thread so the event loop stays free.
+def _history_series():
+    rollups = _history_rollups()
+    return {"series": rollups.series(), "firstDay": str(rollups.first_day), "lastDay": str(rollups.last_day),
+            "forecastVsActual": rollups.has_forecast_error}
+
+def _history_daily(series: str, field: str | None, start: date | None, end: date | None):
+    rollups, name, field, envelope = _history_query(series, field, start, end)
+    return {**envelope, "daily": rollups.daily(name, field, start, end)}
+
+def _history_weekly(series: str, field: str | None, start: date | None, end: date | None):
+    rollups, name, field, envelope = _history_query(series, field, start, end)
+    return {**envelope, "weekly": rollups.weekly(name, field, start, end)}
+
+def _history_profile(series: str, field: str | None, start: date | None, end: date | None, by: str):
+    rollups, name, field, envelope = _history_query(series, field, start, end)
+    return {**envelope, "by": by, "timezone": "UTC", "profile": rollups.profile(name, field, start, end, by)}
+
+def _history_percentiles(series: str, field: str | None, start: date | None, end: date | None, qs: list[float]):
+    rollups, name, field, envelope = _history_query(series, field, start, end)
+    return {**envelope, "percentiles": rollups.percentiles(name, field, qs, start, end)}
+
+def _forecast_vs_actual(start: date | None, end: date | None):
+    rollups, name, _, envelope = _history_query("national", "actual", start, end)
+    if not rollups.has_forecast_error:
+        raise HTTPException(status_code=404, detail="No national forecast and actual history to compare.")
+    return {**envelope, "field": "forecast-actual", **rollups.forecast_vs_actual(start, end)}
+
+async def get_history_series():
+    return await asyncio.to_thread(_history_series)
+
+async def get_history_daily(series: str, field: str | None, start: date | None, end: date | None):
+    return await asyncio.to_thread(_history_daily, series, field, start, end)
+
+async def get_history_weekly(series: str, field: str | None, start: date | None, end: date | None):
+    return await asyncio.to_thread(_history_weekly, series, field, start, end)
+
+async def get_history_profile(series: str, field: str | None, start: date | None, end: date | None, by: str):
+    return await asyncio.to_thread(_history_profile, series, field, start, end, by)
+
+async def get_history_percentiles(series: str, field: str | None, start: date | None, end: date | None, qs: list[float]):
+    return await asyncio.to_thread(_history_percentiles, series, field, start, end, qs)
+
+async def get_forecast_vs_actual(start: date | None, end: date | None):
+    """National forecast accuracy (bias, MAE, RMSE) per day and over the range."""
+    return await asyncio.to_thread(_forecast_vs_actual, start, end)
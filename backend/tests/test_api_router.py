@@ -0,0 +1,50 @@
+# backend/tests/test_api_router.py
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import fast_json, services
+from backend.main import app
+from backend.regional_store import RegionalForecastStore
+from backend.upstream_cache import UpstreamCache
+
+PAYLOAD = {"data": [{
+    "from": "2024-01-01T12:00Z", "to": "2024-01-01T12:30Z",
+    "regions": [{"shortname": "London", "intensity": {"forecast": 120, "index": "moderate"},
+                 "generationmix": [{"fuel": "wind", "perc": 40.0}]}],
+}]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def store():
+        return RegionalForecastStore.from_payload(PAYLOAD)
+
+    monkeypatch.setattr(services, "get_regional_forecast_store", store)
+    monkeypatch.setattr(fast_json, "serialized_cache", UpstreamCache())
+    return TestClient(app)
+
+
+def test_regional_forecast_bodies_are_cached_once_per_region_whatever_the_casing(client):
+    bodies = [client.get(f"/api/v1/intensity/regional/forecast/48h/{name}") for name in ("London", "LONDON", "lOnDoN")]
+    assert [r.status_code for r in bodies] == [200, 200, 200]
+    assert bodies[0].json()["region_name"] == "London"
+    assert len({r.content for r in bodies}) == 1
+    assert fast_json.serialized_cache.stats()["entries"] == 1
+
+
+def test_unknown_regions_are_rejected_before_caching(client):
+    response = client.get("/api/v1/intensity/regional/forecast/48h/Atlantis?format=columnar")
+    assert response.status_code == 404
+    assert fast_json.serialized_cache.stats()["entries"] == 0
+
+
+def test_hot_routes_hand_numpy_results_straight_to_orjson(client, monkeypatch):
+    async def best_time(**kwargs):
+        return {"averageIntensity": np.float64(101.5), "costs": np.arange(3)}
+
+    monkeypatch.setattr(services, "find_best_time_logic", best_time)
+    response = client.get("/api/v1/optimizer/best-time?duration_minutes=60&power_kw=2")
+    assert response.status_code == 200
+    assert response.json() == {"averageIntensity": 101.5, "costs": [0, 1, 2]}
@@ -0,0 +1,79 @@
+# backend/tests/test_dashboard.py
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import orjson
+
+from backend import dashboard, services
+from backend.dashboard import DashboardPayload
+from backend.upstream_cache import UpstreamCache
+
+PERIOD = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+NEXT_PERIOD = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def test_a_new_period_never_gets_the_previous_periods_body(monkeypatch):
+    period = [PERIOD]
+    builds = []
+
+    async def build(region):
+        builds.append(period[0])
+        return DashboardPayload(period[0].isoformat().encode(), f'"{len(builds)}"', True)
+
+    monkeypatch.setattr(dashboard, 'dashboard_cache', UpstreamCache())
+    monkeypatch.setattr(dashboard, 'current_period_start', lambda: period[0])
+    monkeypatch.setattr(dashboard, '_build', build)
+
+    async def run():
+        first = await dashboard.get_dashboard("National")
+        again = await dashboard.get_dashboard("national")
+        period[0] = NEXT_PERIOD
+        return first, again, await dashboard.get_dashboard("National")
+
+    first, again, after = asyncio.run(run())
+    assert first is again
+    assert after.body == NEXT_PERIOD.isoformat().encode()
+    assert builds == [PERIOD, NEXT_PERIOD]
+
+
+class StubRecommendations:
+    async def get_or_compute(self, region):
+        return SimpleNamespace(payload=[])
+
+
+def test_dashboard_built_after_a_rollover_has_the_new_periods_current_values(monkeypatch):
+    clock = [datetime(2024, 1, 1, 12, 10, tzinfo=timezone.utc)]
+    now = lambda: clock[0].timestamp()  # noqa: E731
+
+    def period_start():
+        return clock[0].replace(minute=clock[0].minute - clock[0].minute % 30, second=0, microsecond=0)
+
+    async def upstream(url):
+        stamp = period_start().strftime('%H:%M')
+        if url.endswith('/generation'):
+            return {"data": {"from": stamp, "generationmix": [{"fuel": "wind", "perc": 50}]}}
+        return {"data": [{"from": stamp, "intensity": {"actual": 100}}]}
+
+    async def no_forecast():
+        return []
+
+    monkeypatch.setattr(services, 'upstream_cache', UpstreamCache(clock=now))
+    monkeypatch.setattr(services, '_fetch_from_api_uncached', upstream)
+    monkeypatch.setattr(services, 'get_national_forecast_48h', no_forecast)
+    monkeypatch.setattr(dashboard, 'dashboard_cache', UpstreamCache(clock=now))
+    monkeypatch.setattr(dashboard, 'current_period_start', period_start)
+    monkeypatch.setattr(dashboard, 'recommendation_store', StubRecommendations())
+
+    async def run():
+        before = orjson.loads((await dashboard.get_dashboard("National")).body)
+        # Inside the upstream cache's stale-while-revalidate window for /intensity and /generation.
+        clock[0] = datetime(2024, 1, 1, 12, 31, tzinfo=timezone.utc)
+        after = orjson.loads((await dashboard.get_dashboard("National")).body)
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert before["current"]["from"] == "12:00"
+    assert after["current"]["from"] == "12:30"
+    assert after["periodStart"].startswith("2024-01-01T12:30")
@@ -0,0 +1,87 @@
+# backend/tests/test_data_collector.py
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from backend import data_collector
+
+DAY = date(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def dataset_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_collector, 'DATASET_ROOT', tmp_path)
+
+
+def national_periods(day: date, n: int = 48, actual: bool = True) -> list[dict]:
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    return [{'from': (start + timedelta(minutes=30 * i)).strftime('%Y-%m-%dT%H:%MZ'),
+             'to': (start + timedelta(minutes=30 * (i + 1))).strftime('%Y-%m-%dT%H:%MZ'),
+             'intensity': {'forecast': 150, 'actual': 140 if actual else None, 'index': 'moderate'}}
+            for i in range(n)]
+
+
+def test_only_complete_days_are_checkpointed_as_done():
+    assert data_collector.write_day('national', DAY, national_periods(DAY)) is True
+    short = DAY + timedelta(days=1)
+    assert data_collector.write_day('national', short, national_periods(short, n=47)) is False
+    no_actuals = DAY + timedelta(days=2)
+    assert data_collector.write_day('national', no_actuals, national_periods(no_actuals, actual=False)) is False
+
+    assert data_collector.completed_days('national') == {DAY}
+    assert len(data_collector.partition_files('national')) == 3
+
+
+def test_incomplete_days_are_planned_again():
+    data_collector.write_day('national', DAY, national_periods(DAY))
+    later = DAY + timedelta(days=1)
+    data_collector.write_day('national', later, national_periods(later, n=10))
+    chunks = data_collector.plan_chunks(DAY, DAY + timedelta(days=2), data_collector.completed_days('national'), 14)
+    assert chunks == [[later, DAY + timedelta(days=2)]]
+
+
+def test_a_refetched_day_becomes_complete():
+    data_collector.write_day('national', DAY, national_periods(DAY, actual=False))
+    data_collector.write_day('national', DAY, national_periods(DAY))
+    assert data_collector.completed_days('national') == {DAY}
+
+
+def test_chunks_are_checkpointed_in_completion_order(monkeypatch):
+    first, second = DAY, DAY + timedelta(days=1)
+    written = []
+
+    async def fetch_chunk(client, limiter, semaphore, dataset, days, retries=3):
+        if days == [first]:
+            await asyncio.sleep(0.05)  # e.g. still retrying
+        return national_periods(days[0])
+
+    monkeypatch.setattr(data_collector, 'fetch_chunk', fetch_chunk)
+    monkeypatch.setattr(data_collector, 'completed_days', lambda dataset: set())
+    monkeypatch.setattr(data_collector, 'write_day', lambda dataset, day, periods: written.append(day) or True)
+    asyncio.run(data_collector.collect('national', first, second, concurrency=2, rate=100, chunk_days=1))
+    # The later day is on disk without waiting for the slow first chunk.
+    assert written == [second, first]
+
+
+def test_no_backoff_after_the_last_attempt(monkeypatch):
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    class FailingClient:
+        async def get(self, url):
+            raise httpx.ConnectError("refused")
+
+    class NoLimit:
+        async def wait(self):
+            pass
+
+    monkeypatch.setattr(data_collector.asyncio, 'sleep', sleep)
+    result = asyncio.run(data_collector.fetch_chunk(
+        FailingClient(), NoLimit(), asyncio.Semaphore(1), 'national', [DAY], retries=3))
+    assert result is None
+    assert sleeps == [2, 4]
@@ -0,0 +1,97 @@
+# backend/tests/test_history_rollups.py
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from backend import history_store, services
+from backend.history_rollups import update_rollups
+from backend.history_store import build_store
+
+MONDAY = date(2024, 1, 1)
+DAYS = 8
+PARTIAL_DAY = MONDAY + timedelta(days=3)
+
+
+def write_day(root, day: date, actual: int, n: int = 48) -> None:
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    path = root / 'historical' / 'national' / f"month={day:%Y-%m}" / f"{day:%Y-%m-%d}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({
+        'from': [(start + timedelta(minutes=30 * i)).strftime('%Y-%m-%dT%H:%MZ') for i in range(n)],
+        'intensity.forecast': pd.array([actual + 10] * n, dtype='Int16'),
+        'intensity.actual': pd.array([actual] * n, dtype='Int16'),
+    }).to_parquet(path, index=False)
+
+
+@pytest.fixture
+def rollups(tmp_path, monkeypatch):
+    """Eight days from Monday 2024-01-01, day d flat at 100 + 10d (forecast 10 higher); Thursday has 24 periods."""
+    monkeypatch.setattr(history_store, 'DATASET_DIR', tmp_path / 'historical')
+    for d in range(DAYS):
+        day = MONDAY + timedelta(days=d)
+        write_day(tmp_path, day, 100 + 10 * d, n=24 if day == PARTIAL_DAY else 48)
+    return update_rollups(build_store(tmp_path / 'store'), tmp_path / 'rollups')
+
+
+def test_daily(rollups):
+    days = rollups.daily('national', 'actual')
+    assert len(days) == DAYS
+    assert days[0] == {"date": "2024-01-01", "mean": 100.0, "min": 100, "max": 100, "periods": 48}
+    assert days[3]["periods"] == 24
+    assert [d["date"] for d in rollups.daily('national', 'actual', date(2024, 1, 7), date(2024, 1, 31))] == \
+        ["2024-01-07", "2024-01-08"]
+
+
+def test_weekly_splits_on_mondays(rollups):
+    weeks = rollups.weekly('national', 'actual')
+    assert [w["weekStart"] for w in weeks] == ["2024-01-01", "2024-01-08"]
+    assert weeks[0]["periods"] == 6 * 48 + 24
+    assert (weeks[0]["min"], weeks[0]["max"]) == (100, 160)
+    assert weeks[1] == {"weekStart": "2024-01-08", "mean": 170.0, "min": 170, "max": 170, "periods": 48}
+
+
+def test_profile_by_hour(rollups):
+    profile = rollups.profile('national', 'actual')
+    assert len(profile) == 24
+    assert profile[0] == 135.0                        # every day reports hour 0
+    assert profile[23] == round((1080 - 130) / 7, 2)  # Thursday stops at noon
+    by_week = rollups.profile('national', 'actual', by="hour-of-week")
+    assert by_week[0][0] == 135.0  # the two Mondays: 100 and 170
+    assert by_week[3][23] is None
+
+
+def test_percentiles_interpolate_within_a_bin(rollups):
+    single_day = rollups.percentiles('national', 'actual', [0, 50, 100], MONDAY, MONDAY)
+    assert all(100 <= v <= 105 for v in single_day.values())
+    assert rollups.percentiles('national', 'actual', [50], date(2030, 1, 1)) == {"p50": None}
+
+
+def test_forecast_vs_actual(rollups):
+    result = rollups.forecast_vs_actual()
+    assert result["summary"]["bias"] == 10.0
+    assert result["summary"]["mae"] == 10.0
+    assert result["summary"]["rmse"] == 10.0
+    assert result["days"][0]["forecastMean"] == 110.0
+
+
+def test_incomplete_days_are_recomputed_once_backfilled(rollups, tmp_path):
+    write_day(tmp_path, PARTIAL_DAY, 130)
+    updated = update_rollups(build_store(tmp_path / 'store'), tmp_path / 'rollups')
+    assert updated.daily('national', 'actual', PARTIAL_DAY, PARTIAL_DAY)[0]["periods"] == 48
+
+
+def test_services_validate_and_resolve_series(rollups, monkeypatch):
+    monkeypatch.setattr(services, 'open_rollups', lambda: rollups)
+    daily = asyncio.run(services.get_history_daily("National", None, MONDAY, MONDAY))
+    assert (daily["series"], daily["field"], daily["dayCount"]) == ("national", "actual", 1)
+
+    with pytest.raises(HTTPException) as unknown:
+        asyncio.run(services.get_history_daily("Atlantis", None, None, None))
+    assert unknown.value.status_code == 404
+    with pytest.raises(HTTPException) as inverted:
+        asyncio.run(services.get_history_weekly("national", None, date(2024, 1, 5), MONDAY))
+    assert inverted.value.status_code == 422
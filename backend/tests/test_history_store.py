@@ -0,0 +1,74 @@
+# backend/tests/test_history_store.py
+
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import history_store
+from backend.history_store import MISSING, NATIONAL, HistoryStore, build_store
+
+DAY = date(2024, 1, 1)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_store, 'DATASET_DIR', tmp_path / 'historical')
+    return tmp_path
+
+
+def write_national_day(root, day: date, actual: int, n: int = 48) -> None:
+    start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+    path = root / 'historical' / 'national' / f"month={day:%Y-%m}" / f"{day:%Y-%m-%d}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({
+        'from': [(start + timedelta(minutes=30 * i)).strftime('%Y-%m-%dT%H:%MZ') for i in range(n)],
+        'intensity.forecast': pd.array([actual + 10] * n, dtype='Int16'),
+        'intensity.actual': pd.array([actual] * n, dtype='Int16'),
+    }).to_parquet(path, index=False)
+
+
+def test_build_maps_partitions_onto_the_half_hour_grid(dataset):
+    write_national_day(dataset, DAY, 100)
+    write_national_day(dataset, DAY + timedelta(days=2), 200, n=24)
+    store = build_store(dataset / 'store')
+
+    assert store.n_periods == 3 * 48
+    actual = store.column(NATIONAL, 'actual')
+    assert (actual[:48] == 100).all()
+    assert (actual[48:96] == MISSING).all()
+    assert (actual[96:120] == 200).all() and (actual[120:] == MISSING).all()
+    assert store.index_range(datetime(2024, 1, 2, tzinfo=timezone.utc)) == (48, 144)
+
+
+def test_rebuild_swaps_the_link_and_keeps_open_readers_consistent(dataset):
+    write_national_day(dataset, DAY, 100)
+    reader = build_store(dataset / 'store')
+    write_national_day(dataset, DAY + timedelta(days=1), 150)
+    rebuilt = build_store(dataset / 'store')
+
+    assert (dataset / 'store').is_symlink()
+    assert HistoryStore(dataset / 'store').n_periods == 96
+    assert rebuilt.root != reader.root
+    # The previous build stays readable for readers that opened it.
+    assert reader.column(NATIONAL, 'actual').shape == (48,)
+
+
+def test_leftovers_from_interrupted_builds_do_not_block_the_next_one(dataset):
+    write_national_day(dataset, DAY, 100)
+    for leftover in ('store.20240101T000000000000', 'store.20240101T000000000000.building',
+                     'store.20240102T000000000000.building'):
+        (dataset / leftover).mkdir()
+        (dataset / leftover / 'meta.json').write_text('{}')
+    crashed = dataset / 'store.20240101T000000000000.building'
+    os.utime(crashed, (0, 0))
+    (dataset / 'store').mkdir()  # a store from before builds were versioned
+
+    store = build_store(dataset / 'store')
+
+    assert np.all(store.column(NATIONAL, 'actual') == 100)
+    # Superseded and crashed builds go; a build still in progress and the legacy store stay.
+    assert {p.name for p in dataset.glob('store*')} == {
+        'store', store.root.name, 'store.20240102T000000000000.building', 'store.legacy'}
@@ -0,0 +1,85 @@
+# backend/tests/test_live_updates.py
+
+import asyncio
+from datetime import datetime, timezone
+
+import orjson
+
+from backend import live_updates, services
+from backend.live_updates import LiveBroadcaster
+from backend.recommendation_store import NATIONAL
+from backend.upstream_cache import UpstreamCache
+
+
+def parse(event: bytes) -> tuple[str, dict]:
+    head, data = event.decode().strip().split("\n")
+    return head.removeprefix("event: "), orjson.loads(data.removeprefix("data: "))
+
+
+def state(intensity: int) -> dict:
+    return {"current": {"intensity": intensity}, "generationMix": None,
+            "forecast": {"2024-01-01T12:00Z": {"from": "2024-01-01T12:00Z", "intensity": intensity}},
+            "recommendations": None, "recommendationsEtag": None}
+
+
+def test_updates_are_numbered_after_the_hello(monkeypatch):
+    broadcaster = LiveBroadcaster()
+    values = iter([100, 100, 120])
+
+    async def region_state(region):
+        if region != NATIONAL:
+            raise RuntimeError("no data")
+        return state(next(values))
+
+    monkeypatch.setattr(broadcaster, "_region_state", region_state)
+    monkeypatch.setattr(live_updates, "live_broadcaster", broadcaster)
+
+    async def run():
+        await broadcaster.on_period_refreshed()
+        stream = live_updates.event_stream(NATIONAL, lambda: asyncio.sleep(0, result=False))
+        hello = await anext(stream)
+        await broadcaster.on_period_refreshed()
+        await broadcaster.on_period_refreshed()
+        events = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return hello, events
+
+    hello, events = asyncio.run(run())
+    assert parse(hello) == ("hello", {"region": NATIONAL, "periodStart": parse(hello)[1]["periodStart"], "seq": 1})
+    (_, unchanged), (_, changed) = (parse(e) for e in events)
+    assert [unchanged["seq"], changed["seq"]] == [2, 3]
+    assert "current" not in unchanged and unchanged["forecast"]["upserts"] == []
+    assert changed["current"] == {"intensity": 120}
+
+
+def test_a_slow_subscriber_loses_its_oldest_deltas():
+    broadcaster = LiveBroadcaster(queue_size=2)
+    queue = broadcaster.subscribe("London")
+    for n in range(3):
+        broadcaster._publish("london", str(n).encode())
+    assert [queue.get_nowait(), queue.get_nowait()] == [b"1", b"2"]
+
+
+def test_rollover_delta_uses_fresh_current_values(monkeypatch):
+    clock = [datetime(2024, 1, 1, 12, 10, tzinfo=timezone.utc)]
+
+    async def upstream(url):
+        stamp = clock[0].replace(minute=clock[0].minute - clock[0].minute % 30).strftime('%H:%M')
+        if url.endswith('/generation'):
+            return {"data": {"from": stamp, "generationmix": []}}
+        return {"data": [{"from": stamp}]}
+
+    async def no_forecast():
+        return []
+
+    monkeypatch.setattr(services, 'upstream_cache', UpstreamCache(clock=lambda: clock[0].timestamp()))
+    monkeypatch.setattr(services, '_fetch_from_api_uncached', upstream)
+    monkeypatch.setattr(services, 'get_national_forecast_48h', no_forecast)
+
+    async def run():
+        broadcaster = LiveBroadcaster()
+        await broadcaster._region_state(NATIONAL)
+        clock[0] = datetime(2024, 1, 1, 12, 30, 30, tzinfo=timezone.utc)  # the scheduler's refresh after rollover
+        return await broadcaster._region_state(NATIONAL)
+
+    assert asyncio.run(run())["current"] == {"from": "12:30"}
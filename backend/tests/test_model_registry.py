@@ -0,0 +1,57 @@
+# backend/tests/test_model_registry.py
+
+import pickle
+
+import numpy as np
+import pytest
+
+from backend.model_registry import (MODELS_PATH, ModelRegistry, activate_version, current_version_name,
+                                    load_version, publish_version)
+
+CLUSTER_MAP = {0: {"profile": "short"}, 1: {"profile": "long"}}
+
+
+def publish(models_path, centroids, **kwargs) -> str:
+    return publish_version(np.array(centroids, dtype=np.float64), np.zeros(2), np.ones(2), CLUSTER_MAP,
+                           models_path=models_path, **kwargs)
+
+
+def test_reload_switches_to_a_newly_activated_version(tmp_path):
+    first = publish(tmp_path, [[0.0, 0.0], [10.0, 10.0]])
+    registry = ModelRegistry(tmp_path)
+    assert registry.load()
+    assert registry.current.version == first
+    assert registry.current.predict(np.array([[1.0, 1.0]])).tolist() == [0]
+
+    second = publish(tmp_path, [[10.0, 10.0], [0.0, 0.0]], activate=False)
+    assert not registry.reload_if_changed()  # published, but not current yet
+    activate_version(second, tmp_path)
+
+    assert registry.reload_if_changed()
+    assert registry.current.version == second
+    assert registry.current.predict(np.array([[1.0, 1.0]])).tolist() == [1]
+    assert not registry.reload_if_changed()
+
+
+def test_a_broken_publish_keeps_the_current_version(tmp_path):
+    first = publish(tmp_path, [[0.0, 0.0], [10.0, 10.0]])
+    registry = ModelRegistry(tmp_path)
+    registry.load()
+    activate_version('v-missing', tmp_path)
+
+    assert not registry.reload_if_changed()
+    assert registry.current.version == first
+
+
+def test_committed_version_predicts_like_the_pickled_scaler_and_kmeans():
+    pytest.importorskip("sklearn")
+    with open(MODELS_PATH / 'window_cluster_model.pkl', 'rb') as f:
+        kmeans = pickle.load(f)
+    with open(MODELS_PATH / 'window_scaler.pkl', 'rb') as f:
+        scaler = pickle.load(f)
+    # FEATURE_COLUMNS: duration (minutes), depth below the threshold, stability (std inside the window).
+    features = np.random.default_rng(0).uniform([30, 0, 0], [600, 0.6, 40], (500, 3))
+
+    model = load_version(current_version_name(MODELS_PATH), MODELS_PATH)
+
+    np.testing.assert_array_equal(model.predict(features), kmeans.predict(scaler.transform(features)))
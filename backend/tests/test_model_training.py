@@ -0,0 +1,53 @@
+# backend/tests/test_model_training.py
+
+import numpy as np
+
+from backend.history_store import MISSING
+from backend.model_training import featurize_history, ids_stable, merge_scaler, update_centroids
+
+
+def test_merge_scaler_matches_fitting_on_all_samples():
+    rng = np.random.default_rng(3)
+    old, new = rng.normal(5, 2, (400, 3)), rng.normal(7, 3, (60, 3))
+    mean, scale, n = merge_scaler(old.mean(axis=0), old.std(axis=0), len(old), new)
+    both = np.vstack([old, new])
+    assert n == 460
+    np.testing.assert_allclose(mean, both.mean(axis=0))
+    np.testing.assert_allclose(scale, both.std(axis=0))
+
+
+def test_merge_scaler_leaves_zero_variance_features_unscaled():
+    mean, scale, _ = merge_scaler(np.array([1.0]), np.array([1.0]), 10, np.ones((5, 1)))
+    _, flat_scale, _ = merge_scaler(np.array([1.0]), np.array([0.0]), 10, np.ones((5, 1)))
+    assert mean[0] == 1.0 and scale[0] < 1.0
+    assert flat_scale[0] == 1.0
+
+
+def test_update_centroids_is_a_count_weighted_mean():
+    centroids = np.array([[0.0, 0.0], [10.0, 10.0]])
+    counts = np.array([3, 1])
+    batch = np.array([[1.0, 1.0], [9.0, 9.0], [11.0, 11.0]])
+    updated, new_counts = update_centroids(centroids, counts, batch)
+    np.testing.assert_allclose(updated, [[0.25, 0.25], [10.0, 10.0]])
+    assert new_counts.tolist() == [4, 3]
+    assert centroids[0, 0] == 0.0  # inputs are not modified
+
+
+def test_update_centroids_processes_mini_batches_in_order():
+    updated, counts = update_centroids(np.array([[0.0]]), np.array([1]), np.array([[2.0], [4.0]]), batch_size=1)
+    np.testing.assert_allclose(updated, [[2.0]])
+    assert counts.tolist() == [3]
+
+
+def test_ids_stable():
+    before = np.array([[0.0], [10.0]])
+    assert ids_stable(before, np.array([[1.0], [9.0]]))
+    assert not ids_stable(before, np.array([[9.0], [1.0]]))
+
+
+def test_featurize_history_leaves_an_open_window_for_the_next_run():
+    actual = np.array([300, 100, 100, 300, 100, 100, MISSING, MISSING], dtype=np.int16)
+    result = featurize_history(actual, threshold=200)
+    assert len(result.features) == 1  # the run at 1-2; the one at 4-5 may still grow
+    assert result.features[0, 0] == 60
+    assert result.resume_index == 4
@@ -0,0 +1,81 @@
+# backend/tests/test_optimizer.py
+
+import numpy as np
+import pytest
+
+from backend.optimizer import best_placement, periods_spanned, schedule_jobs, window_costs
+
+
+def test_window_costs_for_whole_periods():
+    costs = window_costs(np.array([100.0, 200.0, 300.0]), 60)
+    # gCO2 per kW: sum of intensity x hours.
+    np.testing.assert_allclose(costs, [150.0, 250.0])
+
+
+def test_window_costs_weight_a_trailing_partial_period():
+    costs = window_costs(np.array([100.0, 200.0, 300.0]), 45)
+    np.testing.assert_allclose(costs, [(100 + 200 * 0.5) * 0.5, (200 + 300 * 0.5) * 0.5])
+    assert periods_spanned(45) == 2
+
+
+def test_window_costs_when_the_job_is_longer_than_the_horizon():
+    assert len(window_costs(np.array([100.0, 200.0]), 120)) == 0
+
+
+def test_windows_touching_a_gap_are_excluded():
+    intensity = np.array([10.0, 10.0, np.nan, 10.0, 10.0, 10.0])
+    costs = window_costs(intensity, 60)
+    assert np.isnan(costs).tolist() == [False, True, True, False, False]
+    # Partial periods count too: a 45-minute job at period 1 would run into the gap.
+    assert np.isnan(window_costs(intensity, 45)).tolist() == [False, True, True, False, False]
+
+
+def test_best_placement_picks_the_earliest_cheapest_start():
+    placement = best_placement(np.array([300.0, 100.0, 100.0, 100.0, 300.0]), 60)
+    assert (placement.start_index, placement.n_periods) == (1, 2)
+    assert placement.intensity_hours == pytest.approx(100.0)
+    assert placement.emissions_kg(2.0) == pytest.approx(0.2)
+    assert placement.average_intensity(60) == pytest.approx(100.0)
+
+
+def test_best_placement_skips_cheap_windows_across_gaps():
+    placement = best_placement(np.array([50.0, np.nan, 50.0, 300.0, 300.0]), 60)
+    assert placement.start_index == 2  # 50 then 300, not 50 + gap + 50
+
+
+def test_best_placement_returns_none_when_nothing_fits():
+    assert best_placement(np.array([100.0]), 60) is None
+    assert best_placement(np.array([100.0, np.nan, 100.0]), 60) is None
+
+
+def test_uncapped_jobs_each_get_their_own_optimum():
+    intensity = np.array([300.0, 100.0, 200.0, 300.0])
+    placements = schedule_jobs(intensity, [(30, 5.0), (30, 5.0), (60, 1.0)])
+    assert [p.start_index for p in placements] == [1, 1, 1]
+
+
+def test_power_cap_pushes_later_jobs_to_the_next_best_slot():
+    intensity = np.array([300.0, 100.0, 200.0, 300.0])
+    placements = schedule_jobs(intensity, [(30, 2.0), (30, 3.0)], power_cap_kw=4.0)
+    # The higher-energy job is placed first and takes the cheapest period.
+    assert placements[1].start_index == 1
+    assert placements[0].start_index == 2
+
+
+def test_power_cap_allows_jobs_that_fit_together():
+    placements = schedule_jobs(np.array([300.0, 100.0, 300.0]), [(30, 2.0), (30, 2.0)], power_cap_kw=4.0)
+    assert [p.start_index for p in placements] == [1, 1]
+
+
+def test_jobs_that_cannot_fit_under_the_cap_get_none():
+    intensity = np.array([100.0, 200.0])
+    placements = schedule_jobs(intensity, [(60, 3.0), (30, 2.0), (30, 5.0)], power_cap_kw=4.0)
+    assert placements[0].start_index == 0
+    assert placements[1] is None  # both periods already carry 3 kW
+    assert placements[2] is None  # above the cap on its own
+
+
+def test_capped_jobs_avoid_gaps():
+    intensity = np.array([50.0, np.nan, 200.0, 300.0])
+    placements = schedule_jobs(intensity, [(60, 1.0)], power_cap_kw=4.0)
+    assert placements[0].start_index == 2
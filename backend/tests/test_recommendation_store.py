@@ -0,0 +1,80 @@
+# backend/tests/test_recommendation_store.py
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import api_router, services
+from backend import recommendation_store as store_module
+from backend.main import app
+from backend.model_registry import model_registry
+from backend.recommendation_store import RecommendationStore
+
+PERIOD = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Counts pipeline runs; each run's payload names the model version it used."""
+    calls = []
+
+    async def recommendations(region_shortname=None):
+        calls.append(region_shortname)
+        return [{"region": region_shortname, "model": model_registry.current.version}]
+
+    monkeypatch.setattr(services, "get_appliance_recommendations", recommendations)
+    monkeypatch.setattr(store_module, "current_period_start", lambda: PERIOD)
+    monkeypatch.setattr(model_registry, "current", SimpleNamespace(version="v1"))
+    return calls
+
+
+def test_results_are_computed_once_per_period(pipeline):
+    store = RecommendationStore()
+
+    async def scenario():
+        first = await store.get_or_compute("London")
+        again = await store.get_or_compute("london")
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert again is first
+    assert pipeline == ["London"]
+
+
+def test_a_model_hot_swap_invalidates_stored_results(pipeline, monkeypatch):
+    store = RecommendationStore()
+    first = asyncio.run(store.get_or_compute("London"))
+
+    monkeypatch.setattr(model_registry, "current", SimpleNamespace(version="v2"))
+    assert store.get("London") is None
+    second = asyncio.run(store.get_or_compute("London"))
+
+    assert second.model_version == "v2"
+    assert second.etag != first.etag
+    assert len(pipeline) == 2
+
+
+def test_a_period_rollover_invalidates_stored_results(pipeline, monkeypatch):
+    store = RecommendationStore()
+    asyncio.run(store.get_or_compute(None))
+    monkeypatch.setattr(store_module, "current_period_start", lambda: PERIOD.replace(minute=30))
+    assert store.get(None) is None
+
+
+def test_endpoint_answers_a_matching_etag_with_304(pipeline, monkeypatch):
+    monkeypatch.setattr(api_router, "recommendation_store", RecommendationStore())
+    client = TestClient(app)
+    url = "/api/v1/optimizer/appliance-recommendations?region_shortname=London"
+
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert response.json() == [{"region": "London", "model": "v1"}]
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert len(pipeline) == 1
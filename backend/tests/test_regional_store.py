@@ -0,0 +1,64 @@
+# backend/tests/test_regional_store.py
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from backend.benchmarks.payloads import REGIONS, regional_payload
+from backend.regional_store import MISSING_FORECAST, RegionalForecastStore
+
+START = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def scan_payload(payload: dict, region_shortname: str) -> list:
+    """The per-request scan the store replaced, kept as the reference output."""
+    return [{"from": period['from'], "to": period['to'], "intensity": entry['intensity'],
+             "generationmix": entry.get('generationmix', []), "region_name": entry.get('shortname')}
+            for period in payload['data'] for entry in period.get('regions', [])
+            if (entry.get('shortname') or '').lower() == region_shortname.lower()]
+
+
+def test_forecast_periods_match_scanning_the_payload_for_every_region():
+    payload = regional_payload(START, START + timedelta(hours=48))
+    store = RegionalForecastStore.from_payload(payload)
+
+    assert len(store) == 96
+    assert store.region_names == [name for _, name in REGIONS]
+    for _, name in REGIONS:
+        assert store.forecast_periods(name) == scan_payload(payload, name)
+
+
+def test_lookups_accept_any_casing_and_return_none_for_unknown_regions():
+    store = RegionalForecastStore.from_payload(regional_payload(START, START + timedelta(hours=1)))
+    assert store.canonical_name("north WALES & merseyside") == "North Wales & Merseyside"
+    assert store.forecast_periods("LONDON") is store.forecast_periods("London")
+    assert store.canonical_name("Atlantis") is None
+    assert store.intensities("Atlantis") is None
+    assert store.forecast_periods("Atlantis") is None
+
+
+def test_gaps_and_fuel_order_differences_are_handled():
+    payload = {"data": [
+        {"from": "2024-01-01T12:00Z", "to": "2024-01-01T12:30Z", "regions": [
+            {"shortname": "London", "intensity": {"forecast": 120, "index": "moderate"},
+             "generationmix": [{"fuel": "gas", "perc": 30.0}, {"fuel": "wind", "perc": 70.0}]},
+        ]},
+        {"from": "2024-01-01T12:30Z", "to": "2024-01-01T13:00Z", "regions": [
+            {"shortname": "Wales", "intensity": {"forecast": 90, "index": "low"},
+             "generationmix": [{"fuel": "wind", "perc": 60.0}, {"fuel": "gas", "perc": 40.0}]},
+            {"shortname": "London", "intensity": {"forecast": None, "index": "moderate"}, "generationmix": []},
+        ]},
+    ]}
+    store = RegionalForecastStore.from_payload(payload)
+
+    np.testing.assert_array_equal(store.intensities("London"), [120, MISSING_FORECAST])
+    np.testing.assert_array_equal(store.intensities("Wales"), [MISSING_FORECAST, 90])
+    assert [p["from"] for p in store.forecast_periods("London")] == ["2024-01-01T12:00Z"]
+    assert store.forecast_periods("Wales")[0]["generationmix"] == [
+        {"fuel": "gas", "perc": 40.0}, {"fuel": "wind", "perc": 60.0}]
+
+
+def test_an_empty_payload_gives_an_empty_store():
+    store = RegionalForecastStore.from_payload({})
+    assert len(store) == 0
+    assert store.forecast_periods("London") is None
@@ -0,0 +1,139 @@
+# backend/tests/test_resilience.py
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from backend import services
+from backend.resilience import (CircuitBreaker, RetryPolicy, SnapshotStore, UpstreamUnavailable,
+                                call_with_retries, track_staleness)
+
+FAST = RetryPolicy(deadline_seconds=1.0, attempt_timeout_seconds=0.5, max_attempts=3,
+                   backoff_base_seconds=0.0, backoff_max_seconds=0.0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def failing(error: Exception, calls: list):
+    async def attempt():
+        calls.append(1)
+        raise error
+    return attempt
+
+
+# --- Circuit Breaker ---
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=FakeClock())
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_probe_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()  # the probe is still in flight
+
+
+def test_failed_probe_reopens_and_successful_probe_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 60
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_released_probe_can_be_retried():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+    breaker.record_failure()
+    clock.now = 30
+    breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+# --- Retries ---
+def test_transient_errors_are_retried_then_open_the_circuit():
+    breaker, calls = CircuitBreaker(failure_threshold=1), []
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(call_with_retries(failing(httpx.ConnectError("refused"), calls), FAST, breaker))
+    assert len(calls) == FAST.max_attempts
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(UpstreamUnavailable, match="circuit open"):
+        asyncio.run(call_with_retries(failing(httpx.ConnectError("refused"), calls), FAST, breaker))
+    assert len(calls) == FAST.max_attempts
+
+
+def test_non_json_bodies_count_as_upstream_failures():
+    breaker, calls = CircuitBreaker(failure_threshold=1), []
+    error = json.JSONDecodeError("Expecting value", "<html>", 0)
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(call_with_retries(failing(error, calls), FAST, breaker))
+    assert len(calls) == FAST.max_attempts
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_client_errors_propagate_without_retry_or_tripping():
+    request = httpx.Request("GET", "https://example.test")
+    error = httpx.HTTPStatusError("not found", request=request, response=httpx.Response(404, request=request))
+    breaker, calls = CircuitBreaker(failure_threshold=1), []
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(call_with_retries(failing(error, calls), FAST, breaker))
+    assert len(calls) == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+# --- Snapshot Fallback ---
+class GarbageClient:
+    async def get(self, url):
+        return httpx.Response(200, text="<html>Bad gateway</html>", request=httpx.Request("GET", url))
+
+
+def test_garbage_body_falls_back_to_the_last_good_snapshot(tmp_path, monkeypatch):
+    url = f"{services.API_BASE_URL}/intensity"
+    store = SnapshotStore(tmp_path)
+    monkeypatch.setattr(services, "snapshot_store", store)
+    monkeypatch.setattr(services, "upstream_retry_policy", FAST)
+    monkeypatch.setattr(services, "upstream_breaker", CircuitBreaker())
+    monkeypatch.setattr(services, "upstream_client", GarbageClient())
+
+    async def run():
+        await store.save(url, {"data": [{"intensity": {"actual": 150}}]})
+        scope = track_staleness()
+        payload = await services._fetch_from_api_uncached(url)
+        return payload, scope.stale
+
+    payload, stale = asyncio.run(run())
+    assert payload == {"data": [{"intensity": {"actual": 150}}]}
+    assert stale
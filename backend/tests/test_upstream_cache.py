@@ -0,0 +1,139 @@
+# backend/tests/test_upstream_cache.py
+
+import asyncio
+from datetime import datetime, timezone
+
+from backend.resilience import FALLBACK_TTL_SECONDS, mark_stale, track_staleness
+from backend.upstream_cache import UpstreamCache, next_period_start
+
+# 12:10 UTC, so the entry is fresh until 12:30.
+T0 = datetime(2024, 1, 1, 12, 10, tzinfo=timezone.utc).timestamp()
+BOUNDARY = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now: float = T0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Loader:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.calls
+
+
+def test_next_period_start():
+    now = datetime(2024, 1, 1, 12, 59, 59, tzinfo=timezone.utc)
+    assert next_period_start(now) == datetime(2024, 1, 1, 13, 0, tzinfo=timezone.utc)
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    async def run():
+        cache, loader = UpstreamCache(clock=FakeClock()), Loader(delay=0.01)
+        values = await asyncio.gather(*(cache.get("k", loader) for _ in range(10)))
+        return values, loader.calls, cache.stats()
+
+    values, calls, stats = asyncio.run(run())
+    assert values == [1] * 10
+    assert calls == 1
+    assert stats["misses"] == 1 and stats["coalesced"] == 9
+
+
+def test_fresh_until_follows_the_injected_clock():
+    async def run():
+        clock, loader = FakeClock(), Loader()
+        cache = UpstreamCache(clock=clock)
+        await cache.get("k", loader)
+        clock.now = BOUNDARY - 1
+        hit = await cache.get("k", loader)
+        return hit, loader.calls, cache._entries["k"].fresh_until
+
+    hit, calls, fresh_until = asyncio.run(run())
+    assert (hit, calls) == (1, 1)
+    assert fresh_until == BOUNDARY
+
+
+def test_stale_while_revalidate_serves_old_value_and_refreshes_once():
+    async def run():
+        clock, loader = FakeClock(), Loader(delay=0.01)
+        cache = UpstreamCache(stale_seconds=300, clock=clock)
+        await cache.get("k", loader)
+        clock.now = BOUNDARY + 10
+        stale = await asyncio.gather(*(cache.get("k", loader) for _ in range(5)))
+        await asyncio.sleep(0.05)
+        refreshed = await cache.get("k", loader)
+        return stale, refreshed, loader.calls, cache.stats()
+
+    stale, refreshed, calls, stats = asyncio.run(run())
+    assert stale == [1] * 5
+    assert refreshed == 2
+    assert calls == 2
+    assert stats["refreshes"] == 1
+
+
+def test_past_the_stale_window_callers_wait_for_the_new_value():
+    async def run():
+        clock, loader = FakeClock(), Loader()
+        cache = UpstreamCache(stale_seconds=300, clock=clock)
+        await cache.get("k", loader)
+        clock.now = BOUNDARY + 301
+        return await cache.get("k", loader)
+
+    assert asyncio.run(run()) == 2
+
+
+def test_failed_load_is_not_cached():
+    async def run():
+        cache, attempts = UpstreamCache(clock=FakeClock()), []
+
+        async def failing():
+            attempts.append(1)
+            raise RuntimeError("down")
+
+        for _ in range(2):
+            try:
+                await cache.get("k", failing)
+            except RuntimeError:
+                pass
+        return len(attempts), cache.stats()["errors"]
+
+    assert asyncio.run(run()) == (2, 2)
+
+
+def test_fallback_values_expire_early_and_mark_their_callers():
+    async def run():
+        clock = FakeClock()
+        cache = UpstreamCache(clock=clock)
+
+        async def from_snapshot():
+            mark_stale(T0 - 600)
+            return "snapshot"
+
+        await cache.get("k", from_snapshot)
+        scope = track_staleness()
+        await cache.get("k", from_snapshot)
+        return cache._entries["k"], scope
+
+    entry, scope = asyncio.run(run())
+    assert entry.fresh_until == T0 + FALLBACK_TTL_SECONDS
+    assert scope.fetched_at == T0 - 600
+
+
+def test_fresh_only_reads_wait_for_the_refresh_instead_of_serving_stale():
+    async def run():
+        clock, loader = FakeClock(), Loader()
+        cache = UpstreamCache(stale_seconds=300, clock=clock)
+        await cache.get("k", loader)
+        clock.now = BOUNDARY + 10
+        fresh = await cache.get("k", loader, allow_stale=False)
+        return fresh, await cache.get("k", loader), loader.calls
+
+    assert asyncio.run(run()) == (2, 2, 2)
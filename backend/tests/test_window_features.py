@@ -0,0 +1,49 @@
+# backend/tests/test_window_features.py
+
+import numpy as np
+
+from backend.window_features import FEATURE_COLUMNS, find_low_carbon_windows
+
+
+def test_runs_below_threshold_become_windows():
+    windows = find_low_carbon_windows([50, 50, 200, 80, 90, 100, 200], threshold=150)
+    assert windows.start.tolist() == [0, 3]
+    assert windows.stop.tolist() == [2, 6]
+    assert windows.mean.tolist() == [50.0, 90.0]
+    assert windows.duration.tolist() == [60.0, 90.0]
+    np.testing.assert_allclose(windows.depth, [(150 - 50) / 150, (150 - 90) / 150])
+    np.testing.assert_allclose(windows.stability, [0.0, np.std([80, 90, 100])])
+
+
+def test_threshold_defaults_to_the_series_mean():
+    windows = find_low_carbon_windows([100, 300, 100, 300])
+    assert windows.threshold == 200
+    assert windows.start.tolist() == [0, 2]
+
+
+def test_missing_periods_split_windows():
+    nan = find_low_carbon_windows([10, 10, np.nan, 10], threshold=50)
+    sentinel = find_low_carbon_windows(np.array([10, 10, -1, 10], dtype=np.int16), threshold=50, missing_value=-1)
+    for windows in (nan, sentinel):
+        assert windows.start.tolist() == [0, 3]
+        assert windows.stop.tolist() == [2, 4]
+
+
+def test_min_periods_drops_short_windows():
+    windows = find_low_carbon_windows([10, 90, 10, 10, 90], threshold=50, min_periods=2)
+    assert windows.start.tolist() == [2]
+    assert len(windows) == 1
+
+
+def test_flat_windows_on_a_long_series_have_zero_stability():
+    # Large offsets defeat one-pass variance formulas; a flat window must still be exactly 0.
+    series = np.tile([180.0] * 47 + [400.0], 2000)
+    windows = find_low_carbon_windows(series, threshold=200)
+    assert len(windows) == 2000
+    assert (windows.stability == 0).all()
+
+
+def test_no_windows():
+    windows = find_low_carbon_windows([300, 300], threshold=100)
+    assert len(windows) == 0
+    assert windows.features().shape == (0, len(FEATURE_COLUMNS))
@@ -0,0 +1,153 @@
+# backend/upstream_cache.py
+
+import logging
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable
+
+from .resilience import FALLBACK_TTL_SECONDS, mark_stale, track_staleness
+
+logger = logging.getLogger(__name__)
+
+SETTLEMENT_PERIOD = timedelta(minutes=30)
+
+
+def current_period_start(now: datetime | None = None) -> datetime:
+    """Start of the half-hour settlement period containing `now` (UTC)."""
+    now = now or datetime.now(timezone.utc)
+    return now.replace(minute=now.minute - now.minute % 30, second=0, microsecond=0)
+
+
+def next_period_start(now: datetime | None = None) -> datetime:
+    """Start of the settlement period after the one containing `now` (UTC)."""
+    return current_period_start(now) + SETTLEMENT_PERIOD
+
+
+# --- Cache Entries ---
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float  # epoch seconds; the next settlement boundary when stored
+    stale_until: float  # epoch seconds; last moment we may still serve it while revalidating
+    fallback_at: float | None = None  # fetch time of the last-good snapshot it was built from, if any
+
+
+class UpstreamCache:
+    """
+    URL-keyed cache for upstream responses whose TTL ends at the next half-hour
+    settlement boundary. Expired entries are served stale for `stale_seconds`
+    while a single background refresh runs, and concurrent misses for the same
+    key are merged into one upstream call (single-flight). Values built from a
+    last-good snapshot (see resilience.py) are only kept briefly, and every
+    caller they are served to is marked stale.
+
+    Runs on the event loop: every bookkeeping step happens between awaits, so
+    no locking is needed.
+    """
+
+    def __init__(self, stale_seconds: float = 300.0, clock: Callable[[], float] = time.time):
+        self.stale_seconds = stale_seconds
+        self._clock = clock
+        self._entries: dict[str, _Entry] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+            "refreshes": 0, "errors": 0, "upstream_calls": 0,
+            "upstream_latency_total_s": 0.0, "upstream_latency_max_s": 0.0,
+        }
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]], allow_stale: bool = True) -> Any:
+        """
+        Returns the cached value for `key`, awaiting `loader` only when needed.
+
+        With `allow_stale=False` an expired entry is never served: the caller waits
+        for the refresh (joining one already in flight). Use it for keys that are not
+        period-stamped when the result is itself cached for the new period.
+        """
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and now < entry.fresh_until:
+            self._stats["hits"] += 1
+            return self._served(entry)
+        if allow_stale and entry is not None and now < entry.stale_until:
+            self._stats["stale_hits"] += 1
+            if key not in self._inflight:
+                self._stats["refreshes"] += 1
+                self._start_flight(key, loader)
+            return self._served(entry)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = self._start_flight(key, loader)
+        # Shielded so one cancelled client doesn't cancel the fetch its peers are waiting on.
+        value = await asyncio.shield(task)
+        entry = self._entries.get(key)
+        if entry is not None and entry.value is value:
+            self._served(entry)
+        return value
+
+    @staticmethod
+    def _served(entry: _Entry) -> Any:
+        # Callers of a value built from a last-good snapshot inherit its staleness.
+        if entry.fallback_at is not None:
+            mark_stale(entry.fallback_at)
+        return entry.value
+
+    def _start_flight(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight[key] = asyncio.create_task(self._run_flight(key, loader))
+        # Background refreshes (or flights whose waiters were all cancelled) may never be
+        # awaited; their failure is already logged in _run_flight.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _run_flight(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        # Runs in the flight's own task, so this scope only sees what the loader touched.
+        staleness = track_staleness()
+        try:
+            value = await loader()
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Upstream refresh failed for {key}: {e}")
+            raise
+        else:
+            fresh_until = next_period_start(datetime.fromtimestamp(self._clock(), tz=timezone.utc)).timestamp()
+            if staleness.stale:
+                # Don't pin fallback data for the rest of the period; retry upstream soon.
+                fresh_until = min(fresh_until, self._clock() + FALLBACK_TTL_SECONDS)
+            self._entries[key] = _Entry(value, fresh_until, fresh_until + self.stale_seconds, staleness.fetched_at)
+            self._evict_expired(self._clock())
+            return value
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stats["upstream_calls"] += 1
+            self._stats["upstream_latency_total_s"] += elapsed
+            self._stats["upstream_latency_max_s"] = max(self._stats["upstream_latency_max_s"], elapsed)
+            self._inflight.pop(key, None)
+
+    def _evict_expired(self, now: float) -> None:
+        # Period-stamped URLs are never requested again once their period ends.
+        expired = [k for k, e in self._entries.items() if now >= e.stale_until]
+        for k in expired:
+            del self._entries[k]
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of the hit/miss/latency counters."""
+        stats = dict(self._stats)
+        stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        calls = stats["upstream_calls"]
+        stats["upstream_latency_avg_s"] = round(stats["upstream_latency_total_s"] / calls, 4) if calls else 0.0
+        return stats
@@ -0,0 +1,56 @@
+# backend/upstream_client.py
+
+import asyncio
+import logging
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# --- Pool Configuration ---
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0)
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class UpstreamClient:
+    """
+    Shared, pooled `httpx.AsyncClient` for the Carbon Intensity API.
+
+    The FastAPI lifespan opens and closes it; scripts that never start the app
+    get a client created lazily on first use. A semaphore bounds how many
+    upstream requests are in flight at once, independently of the pool size.
+    """
+
+    def __init__(self, timeout: httpx.Timeout = DEFAULT_TIMEOUT, limits: httpx.Limits = DEFAULT_LIMITS,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY):
+        self.timeout = timeout
+        self.limits = limits
+        self.max_concurrency = max_concurrency
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=False,
+                                             headers={"Accept": "application/json"})
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            logger.info("Upstream HTTP connection pool started.")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+            logger.info("Upstream HTTP connection pool closed.")
+
+    async def get(self, url: str) -> httpx.Response:
+        """GET `url` through the pool; raises httpx.HTTPError on transport or HTTP errors."""
+        if self._client is None:
+            await self.start()
+        async with self._semaphore:
+            response = await self._client.get(url)
+        response.raise_for_status()
+        return response
+
+
+upstream_client = UpstreamClient()
@@ -0,0 +1,72 @@
+# backend/window_features.py
+
+from dataclasses import dataclass
+import numpy as np
+
+# Shared by training (create_model_artifacts.py) and serving (services.py) so both
+# describe a low-carbon window with exactly the same numbers.
+FEATURE_COLUMNS = ('duration', 'depth', 'stability')
+PERIOD_MINUTES = 30
+
+
+@dataclass
+class LowCarbonWindows:
+    """Runs of consecutive below-threshold periods, one array element per window."""
+    start: np.ndarray       # index of the first period in the window
+    stop: np.ndarray        # index one past the last period
+    mean: np.ndarray        # mean intensity inside the window
+    duration: np.ndarray    # minutes
+    depth: np.ndarray       # (threshold - mean) / threshold
+    stability: np.ndarray   # population std of intensity inside the window
+    threshold: float
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def features(self) -> np.ndarray:
+        """(n_windows, 3) matrix in FEATURE_COLUMNS order, ready for scaler.transform."""
+        return np.column_stack((self.duration, self.depth, self.stability))
+
+
+def find_low_carbon_windows(intensity, threshold: float | None = None, min_periods: int = 1,
+                            missing_value: int | None = None) -> LowCarbonWindows:
+    """
+    Segments an intensity series into low-carbon windows in one vectorized pass.
+
+    A period is "low" when it is strictly below `threshold` (the series mean by
+    default); missing periods (NaN, or `missing_value` for integer columns such as
+    the history store's) are never low and so split windows. Per-window mean and
+    variance are grouped sums over the low periods, so the cost is O(n) regardless
+    of window count.
+    """
+    x = np.asarray(intensity, dtype=np.float64)
+    valid = ~np.isnan(x) if missing_value is None else np.asarray(intensity) != missing_value
+    if threshold is None:
+        threshold = float(x[valid].mean()) if valid.any() else 0.0
+
+    is_low = valid & (x < threshold)
+    edges = np.diff(np.concatenate(([0], is_low.view(np.int8), [0])))
+    start = np.flatnonzero(edges == 1)
+    stop = np.flatnonzero(edges == -1)
+    length = stop - start
+    if min_periods > 1:
+        keep = length >= min_periods
+        start, stop, length = start[keep], stop[keep], length[keep]
+
+    # Two passes over the low periods only: window means, then squared deviations from
+    # each window's own mean. One-pass prefix sums of x^2 cancel catastrophically and
+    # leave a flat window with a std of ~1e-7 instead of 0.
+    window_id = np.repeat(np.arange(len(start)), length)
+    offsets = np.concatenate(([0], np.cumsum(length)[:-1])) if len(length) else length
+    periods = np.repeat(start - offsets, length) + np.arange(len(window_id))
+    values = x[periods]
+    mean = np.bincount(window_id, values, minlength=len(start)) / length
+    deviation = values - mean[window_id]
+    variance = np.bincount(window_id, deviation * deviation, minlength=len(start)) / length
+
+    depth = (threshold - mean) / threshold if threshold > 0 else np.zeros_like(mean)
+    return LowCarbonWindows(
+        start=start, stop=stop, mean=mean,
+        duration=(length * PERIOD_MINUTES).astype(np.float64),
+        depth=depth, stability=np.sqrt(variance), threshold=threshold,
+    )
@@ -3,6 +3,21 @@
 import { useState, useEffect, useCallback } from 'react';
 
 const API_BASE_URL = 'http://localhost:8001';
+// Safety net behind the live stream (a blocked or silently dead connection). Within a
+// period the dashboard request is answered from the browser cache, so this is cheap.
+const FALLBACK_POLL_MS = 10 * 60 * 1000;
+
+// Applies a live-update forecast delta: drop points that have rolled into the past,
+// then replace or append the points that changed.
+const mergeForecast = (previous, change) => {
+  if (!change) return previous;
+  const byStart = new Map();
+  (previous || []).forEach((point) => {
+    if (!change.since || point.from >= change.since) byStart.set(point.from, point);
+  });
+  (change.upserts || []).forEach((point) => byStart.set(point.from, point));
+  return [...byStart.values()].sort((a, b) => (a.from < b.from ? -1 : 1));
+};
 
 export const useCarbonData = () => {
   // --- STATE MANAGEMENT ---
@@ -34,69 +49,38 @@ export const useCarbonData = () => {
   const [regionError, setRegionError] = useState('');
 
   // --- DATA FETCHING ---
-  const fetchData = useCallback(async (regionToFetch = 'National') => {
-    // This function fetches the main dashboard data (current, forecast, mix)
-    let currentData, forecastArr, generationMix = null, currentError = '';
-
-    try {
-      if (regionToFetch === 'National') {
-        const [currentRes, forecastRes, genMixRes] = await Promise.all([
-          fetch(`${API_BASE_URL}/api/v1/intensity/current`),
-          fetch(`${API_BASE_URL}/api/v1/intensity/forecast/48h`),
-          fetch(`${API_BASE_URL}/api/v1/generation/current`)
-        ]);
-
-        if (!currentRes.ok || !forecastRes.ok || !genMixRes.ok) {
-          throw new Error('Network response for national data was not ok');
-        }
-        currentData = await currentRes.json();
-        forecastArr = await forecastRes.json();
-        const genMixData = await genMixRes.json();
-        generationMix = genMixData.generationmix;
-      } else {
-        setIsLoadingRegionData(true);
-        const [currentRegionalResponse, forecastRegionalResponse] = await Promise.all([
-          fetch(`${API_BASE_URL}/api/v1/intensity/regional/current/${encodeURIComponent(regionToFetch)}`),
-          fetch(`${API_BASE_URL}/api/v1/intensity/regional/forecast/48h/${encodeURIComponent(regionToFetch)}`)
-        ]);
-
-        if (!currentRegionalResponse.ok || !forecastRegionalResponse.ok) {
-          throw new Error(`Could not fetch data for ${regionToFetch}.`);
-        }
-        currentData = await currentRegionalResponse.json();
-        forecastArr = await forecastRegionalResponse.json();
-        generationMix = currentData.generationmix; 
-        setIsLoadingRegionData(false);
-      }
-      return { currentData, forecastArr, generationMix, error: null };
-    } catch (err) {
-      currentError = err.message || 'An unexpected error occurred during data fetch.';
-      console.error(`Failed to fetch data for ${regionToFetch}:`, err);
-      setIsLoadingRegionData(false);
-      return { currentData: null, forecastArr: [], generationMix: null, error: currentError };
+  const fetchData = useCallback(async (regionToFetch = 'National', { background = false } = {}) => {
+    // One request returns every panel (current, forecast, mix, recommendations).
+    // The backend sends an ETag, so repeat polls within a period are answered with 304
+    // and served from the browser cache. Background resyncs don't show loading states.
+    if (!background) {
+      if (regionToFetch !== 'National') setIsLoadingRegionData(true);
+      setIsLoadingRecommendations(true);
     }
-  }, []);
-
-  const fetchRecommendations = useCallback(async (region) => {
-    setIsLoadingRecommendations(true);
-    setApplianceRecommendations([]);
     try {
-      const params = new URLSearchParams();
-      if (region && region !== 'National') {
-        params.append('region_shortname', region);
-      }
-      const url = `${API_BASE_URL}/api/v1/optimizer/appliance-recommendations?${params.toString()}`;
-      const response = await fetch(url);
+      const response = await fetch(`${API_BASE_URL}/api/v1/dashboard/${encodeURIComponent(regionToFetch)}`);
       if (!response.ok) {
-        throw new Error('Failed to fetch smart recommendations.');
+        throw new Error(regionToFetch === 'National'
+          ? 'Network response for national data was not ok'
+          : `Could not fetch data for ${regionToFetch}.`);
       }
-      const data = await response.json();
-      setApplianceRecommendations(data);
+      const dashboard = await response.json();
+      return {
+        currentData: dashboard.current,
+        forecastArr: dashboard.forecast || [],
+        generationMix: dashboard.generationMix,
+        recommendations: dashboard.recommendations || [],
+        error: null,
+      };
     } catch (err) {
-      console.error("Error fetching recommendations:", err);
-      setApplianceRecommendations([]); 
+      const currentError = err.message || 'An unexpected error occurred during data fetch.';
+      console.error(`Failed to fetch data for ${regionToFetch}:`, err);
+      return { currentData: null, forecastArr: [], generationMix: null, recommendations: [], error: currentError };
     } finally {
-      setIsLoadingRecommendations(false);
+      if (!background) {
+        setIsLoadingRegionData(false);
+        setIsLoadingRecommendations(false);
+      }
     }
   }, []);
 
@@ -112,34 +96,15 @@ export const useCarbonData = () => {
         setError('Could not fetch available regions.');
       }
 
-      const { currentData, forecastArr, generationMix, error: initialError } = await fetchData('National');
+      const { currentData, forecastArr, generationMix, recommendations, error: initialError } = await fetchData('National');
       setIntensityData(currentData);
       setForecastData(forecastArr);
       setNationalGenerationMix(generationMix);
+      setApplianceRecommendations(recommendations);
       setError(initialError || '');
-      
-      fetchRecommendations('National');
     };
 
     initialLoad();
-
-    const intervalId = setInterval(async () => {
-      const { currentData, forecastArr, generationMix, error: periodicError } = await fetchData(selectedRegion);
-      if (selectedRegion === 'National') {
-        setIntensityData(currentData);
-        setForecastData(forecastArr);
-        setNationalGenerationMix(generationMix);
-        setError(periodicError || '');
-      } else {
-        setRegionalIntensityData(currentData);
-        setRegionalForecastData(forecastArr.data || []);
-        setRegionalGenerationMix(generationMix);
-        setRegionError(periodicError || '');
-      }
-      fetchRecommendations(selectedRegion);
-    }, 1800000);
-
-    return () => clearInterval(intervalId);
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []); // Intentionally run only once on mount
 
@@ -148,7 +113,8 @@ export const useCarbonData = () => {
       // Clear any selected window when the region changes
       setSelectedWindow(null); 
       
-      const { currentData, forecastArr, generationMix, error: regionalFetchError } = await fetchData(selectedRegion);
+      setApplianceRecommendations([]);
+      const { currentData, forecastArr, generationMix, recommendations, error: regionalFetchError } = await fetchData(selectedRegion);
       if (selectedRegion === 'National') {
         setRegionalIntensityData(null);
         setRegionalForecastData([]);
@@ -156,15 +122,72 @@ export const useCarbonData = () => {
         setRegionError('');
       } else {
         setRegionalIntensityData(currentData);
-        setRegionalForecastData(forecastArr.data || []);
+        setRegionalForecastData(forecastArr);
         setRegionalGenerationMix(generationMix);
         setRegionError(regionalFetchError || '');
       }
-      fetchRecommendations(selectedRegion);
+      setApplianceRecommendations(recommendations);
     };
 
     updateOnRegionChange();
-  }, [selectedRegion, fetchData, fetchRecommendations]);
+  }, [selectedRegion, fetchData]);
+
+  // Live updates: the backend pushes a delta for the selected region after each
+  // half-hour rollover, replacing the old 30-minute polling loop. Deltas only apply
+  // on top of the state they were diffed against, so after a reconnect or a gap in
+  // the broadcast numbers the full dashboard is fetched again instead.
+  useEffect(() => {
+    const isNational = selectedRegion === 'National';
+    let cancelled = false;
+    let lastSeq = null;
+    let connected = false;
+
+    const resync = async () => {
+      const { currentData, forecastArr, generationMix, recommendations, error: resyncError } =
+        await fetchData(selectedRegion, { background: true });
+      if (cancelled || resyncError) return;
+      (isNational ? setIntensityData : setRegionalIntensityData)(currentData);
+      (isNational ? setForecastData : setRegionalForecastData)(forecastArr);
+      (isNational ? setNationalGenerationMix : setRegionalGenerationMix)(generationMix);
+      setApplianceRecommendations(recommendations);
+    };
+
+    const poll = setInterval(resync, FALLBACK_POLL_MS);
+    if (typeof EventSource === 'undefined') {
+      return () => {
+        cancelled = true;
+        clearInterval(poll);
+      };
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/api/v1/stream/${encodeURIComponent(selectedRegion)}`);
+    source.addEventListener('hello', (event) => {
+      const hello = JSON.parse(event.data);
+      // The first hello follows the region-change fetch; any later one is a reconnect
+      // and updates may have been missed while disconnected.
+      if (connected) resync();
+      connected = true;
+      lastSeq = hello.seq;
+    });
+    source.addEventListener('update', (event) => {
+      const delta = JSON.parse(event.data);
+      const missedUpdates = lastSeq !== null && delta.seq !== lastSeq + 1;
+      lastSeq = delta.seq;
+      if (missedUpdates) {
+        resync();
+        return;
+      }
+      if (delta.current) (isNational ? setIntensityData : setRegionalIntensityData)(delta.current);
+      if (delta.generationMix) (isNational ? setNationalGenerationMix : setRegionalGenerationMix)(delta.generationMix);
+      (isNational ? setForecastData : setRegionalForecastData)((previous) => mergeForecast(previous, delta.forecast));
+      if (delta.recommendations) setApplianceRecommendations(delta.recommendations);
+    });
+    return () => {
+      cancelled = true;
+      clearInterval(poll);
+      source.close();
+    };
+  }, [selectedRegion, fetchData]);
 
   // --- DERIVED DATA ---
   const displayIntensityData = selectedRegion === 'National' ? intensityData : regionalIntensityData;